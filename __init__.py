@@ -1,5 +1,4 @@
 
-from gui.sudoku import SudokuApp
 import cProfile
 import model.solver
 from model.board import Board
@@ -37,10 +36,13 @@ def run_program():
     s.solve()
 
 
+    #from gui.sudoku import SudokuApp
     #SudokuApp(board_str).run()
 
 
 def generate_puzzle():
+    # Kivy is only imported when the GUI is needed, so the model can be used headless.
+    from gui.sudoku import SudokuApp
 
     start = time.time()
 
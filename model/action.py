@@ -1,6 +1,6 @@
 
 from abc import ABC, abstractmethod
-from model.cell import Cell
+from model.cell import Cell, value_bit
 
 from model.board import Board
 
@@ -33,15 +33,10 @@ class Action(ABC):
         return "%s (%d,%d): %d" % (self.__class__.__name__, self._x, self._y, self._value)
 
 
-def _clear_possible_action(board: Board, mod_cell: Cell, value: int):
-    if mod_cell.is_initial():
-        return
-
-    if mod_cell.value() is not None:
-        return
-
-    if mod_cell.has_possible_val(value):
-        new_cell = mod_cell.clear_possible_value(value)
+def _clear_possible_action(board: Board, mod_cell: Cell, value_mask: int):
+    # Initial and filled cells report an empty possible mask, so this covers those cases too.
+    if mod_cell.possible_mask() & value_mask:
+        new_cell = mod_cell.clear_possible_value(value_mask.bit_length())
         board.set_cell(new_cell)
 
 
@@ -61,11 +56,9 @@ class SetAction(Action):
         new_cell = mod_cell.set_value(self._value, self._initial)
         board.set_cell(new_cell)
 
-        link_cells = board.linked_cells(mod_cell.x(), mod_cell.y())
-        link_cells.remove(new_cell)
-
-        for cell in link_cells:
-            _clear_possible_action(board, cell, self._value)
+        value_mask = value_bit(self._value)
+        for cell in board.peer_cells(mod_cell.x(), mod_cell.y()):
+            _clear_possible_action(board, cell, value_mask)
 
 
 class InitialSetAction(SetAction):
@@ -0,0 +1,111 @@
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from collections import deque
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import itertools
+import os
+import time
+
+from model.board import create_board_from_string
+from model.lockstep import ENGINE_LOCKSTEP, solve_lockstep
+from model.solver import ENGINE_DLX, solve_board
+
+
+# The result of solving one puzzle string.  solution is the solved board in the str(Board) format,
+# or None if the puzzle has no solution or could not be solved, in which case error says why.
+class SolveResult(NamedTuple):
+    index: int
+    puzzle: str
+    solution: Optional[str]
+    elapsed: float
+    error: Optional[str]
+
+
+def _solve_puzzle(index: int, puzzle: str, engine: str) -> SolveResult:
+    start = time.perf_counter()
+
+    try:
+        board, init_actions = create_board_from_string(puzzle)
+        board = solve_board(board, engine)
+
+        if board.is_solved():
+            solution = str(board)
+            error = None
+        else:
+            solution = None
+            error = "no solution"
+    except Exception as e:
+        solution = None
+        error = "%s: %s" % (e.__class__.__name__, e)
+
+    return SolveResult(index, puzzle, solution, time.perf_counter() - start, error)
+
+
+# Solves the chunk with solve_lockstep, where each puzzle is given an equal share of the time the chunk took.
+# A chunk with a malformed puzzle is solved one puzzle at a time instead, so the error is reported for that puzzle.
+def _solve_chunk_lockstep(chunk: List[Tuple[int, str]]) -> List[SolveResult]:
+    start = time.perf_counter()
+
+    try:
+        solutions = solve_lockstep([puzzle for index, puzzle in chunk])
+    except ValueError:
+        return [_solve_puzzle(index, puzzle, ENGINE_DLX) for index, puzzle in chunk]
+
+    elapsed = (time.perf_counter() - start) / len(chunk)
+
+    return [SolveResult(index, puzzle, solution, elapsed, None if solution is not None else "no solution")
+            for (index, puzzle), solution in zip(chunk, solutions)]
+
+
+def _solve_chunk(chunk: List[Tuple[int, str]], engine: str) -> List[SolveResult]:
+    if engine == ENGINE_LOCKSTEP:
+        return _solve_chunk_lockstep(chunk)
+
+    return [_solve_puzzle(index, puzzle, engine) for index, puzzle in chunk]
+
+
+# Solves a stream of puzzle strings (in any format create_board_from_string accepts) across a pool of processes.
+#
+# Puzzles are sent to the workers in chunks of chunksize, and only a few chunks per worker are in flight at once,
+# so puzzles can come from a generator over a file that does not fit in memory.  Results come back in input order,
+# or as soon as each chunk completes if ordered is False.  Setting workers to 1 solves in the calling process.
+# With ENGINE_LOCKSTEP, every chunk is solved at once by solve_lockstep, which works best with large chunks.
+def solve_many(puzzles: Iterable[str], workers: int = None, chunksize: int = 16,
+               ordered: bool = True, engine: str = ENGINE_DLX) -> Iterator[SolveResult]:
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    indexed = enumerate(puzzles)
+    chunks = iter(lambda: list(itertools.islice(indexed, chunksize)), [])
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk, engine)
+        return
+
+    max_pending = workers * 4
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        for chunk in itertools.islice(chunks, max_pending):
+            pending.append(executor.submit(_solve_chunk, chunk, engine))
+
+        while len(pending) > 0:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done_set, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in done_set]
+                pending = deque(future for future in pending if future not in done_set)
+
+            for future in done:
+                # Keep the pool busy before handing results back.
+                for chunk in itertools.islice(chunks, 1):
+                    pending.append(executor.submit(_solve_chunk, chunk, engine))
+
+                yield from future.result()
@@ -1,6 +1,6 @@
 
 from __future__ import annotations
-from typing import List, Set, Tuple
+from typing import List, Optional, Tuple
 import math
 
 
@@ -11,13 +11,20 @@ class Board:
 
 from .cell import Cell
 from .action import Action, InitialSetAction
+from .units import UnitTables, unit_tables
 
 
 class Board:
 
     __max_val: int = None
     __max_sqrt: int = None
+    # The board is stored as one list per row.  Boards created by apply_actions share their
+    # rows with the parent board, and only copy a row the first time one of its cells is set.
     __board: List[List[Cell]] = None
+    __owned_rows: List[bool] = None  # Only used while unlocked, None means every row is owned.
+    __trail: List[Cell] = None  # Cells replaced by set_cell on a mutable board, see mutable_copy.
+    __changed: List[Tuple[int, int]] = None  # Cells set by the apply_actions call that created this board.
+    __tables: UnitTables = None
     __is_locked: bool = True
 
     def __init__(self, max_val: int, init_board: bool=True):
@@ -28,6 +35,7 @@ class Board:
 
         self.__max_val = max_val
         self.__max_sqrt = math.floor(math.sqrt(max_val))
+        self.__tables = unit_tables(max_val)
 
         if init_board:
             self.__board = []
@@ -60,45 +68,53 @@ class Board:
         if self.__is_locked:
             raise PermissionError("Cannot modify a board once it is locked!")
 
-        self.__board[cell.x()][cell.y()] = cell
+        x = cell.x()
+        owned_rows = self.__owned_rows
+        if owned_rows is not None and not owned_rows[x]:
+            self.__board[x] = self.__board[x][:]
+            owned_rows[x] = True
 
-    def row_cells(self, x: int, filter_filled=False) -> Set[Cell]:
+        row = self.__board[x]
+        if self.__trail is not None:
+            self.__trail.append(row[cell.y()])
+        elif self.__changed is not None:
+            self.__changed.append((x, cell.y()))
+
+        row[cell.y()] = cell
+
+    def unit_tables(self) -> UnitTables:
+        return self.__tables
+
+    def __cells_at(self, coords: Tuple[Tuple[int, int], ...], filter_filled: bool) -> List[Cell]:
+        board = self.__board
         if filter_filled:
-            return set(cell for cell in self.__board[x] if cell.value() is None)
+            return [cell for cell in (board[x][y] for x, y in coords) if cell.value() is None]
         else:
-            return set(self.__board[x])
+            return [board[x][y] for x, y in coords]
 
-    def col_cells(self, y: int, filter_filled=False) -> Set[Cell]:
+    def row_cells(self, x: int, filter_filled=False) -> List[Cell]:
         if filter_filled:
-            return set(row[y] for row in self.__board if row[y].value() is None)
+            return [cell for cell in self.__board[x] if cell.value() is None]
         else:
-            return set(row[y] for row in self.__board)
-
-    def quadrant_cells(self, x: int, y: int, filter_filled=False) -> Set[Cell]:
-        sqrt_max = math.floor(math.sqrt(self.__max_val))
-
-        # Find out the starting indexes for the quadrant
-        # since we are zero-indexed, quadrants start at 0, sqrt_max, 2 * sqrt_max, etc.
-        # Removing the remainder from the input indexes effectively rounds the numbers.
-        row_min = x - x % sqrt_max
-        col_min = y - y % sqrt_max
-
-        ret_arr = set()
-        for row in range(row_min, row_min + sqrt_max):
-            for col in range(col_min, col_min + sqrt_max):
-                cell = self.__board[row][col]
-                if filter_filled:
-                    if cell.value() is None:
-                        ret_arr.add(cell)
-                else:
-                    ret_arr.add(self.__board[row][col])
+            return self.__board[x][:]
 
-        return ret_arr
+    def col_cells(self, y: int, filter_filled=False) -> List[Cell]:
+        return self.__cells_at(self.__tables.cols()[y], filter_filled)
+
+    def quadrant_cells(self, x: int, y: int, filter_filled=False) -> List[Cell]:
+        return self.__cells_at(self.__tables.quadrant(x, y), filter_filled)
+
+    # Returns the cells of a unit, using the unit numbering of UnitTables.
+    def unit_cells(self, unit: int, filter_filled=False) -> List[Cell]:
+        return self.__cells_at(self.__tables.units()[unit], filter_filled)
 
-    def linked_cells(self, x: int, y: int, filter_filled=False) -> Set[Cell]:
-        return self.row_cells(x, filter_filled)\
-            .union(self.col_cells(y, filter_filled))\
-            .union(self.quadrant_cells(x, y, filter_filled))
+    # Every cell sharing a row, column or quadrant with the given cell, including the cell itself.
+    def linked_cells(self, x: int, y: int, filter_filled=False) -> List[Cell]:
+        return self.__cells_at(self.__tables.linked(x, y), filter_filled)
+
+    # Same as linked_cells, without the given cell.
+    def peer_cells(self, x: int, y: int, filter_filled=False) -> List[Cell]:
+        return self.__cells_at(self.__tables.peers(x, y), filter_filled)
 
     def all_cells(self, filter_filled: bool = False) -> List[Cell]:
         ret_arr = []
@@ -107,7 +123,7 @@ class Board:
             for row in self.__board:
                 for cell in row:
                     if cell.value() is None:
-                        ret_arr.add(cell)
+                        ret_arr.append(cell)
         else:
             for row in self.__board:
                 ret_arr.extend(row)
@@ -156,16 +172,65 @@ class Board:
 
     def apply_actions(self, actions: List[Action]) -> Board:
         ret_board = Board(self.__max_val, False)
-        ret_board.__board = [row[:] for row in self.__board]
+        ret_board.__board = self.__board[:]
+        ret_board.__owned_rows = [False] * self.__max_val
+        ret_board.__changed = []
         ret_board.__is_locked = False
 
         for act in actions:
             act.apply_action(ret_board)
 
+        ret_board.__owned_rows = None
         ret_board.__is_locked = True
 
         return ret_board
 
+    # The coordinates of the cells that the apply_actions call creating this board changed, which may contain repeats.
+    # Returns None for boards that were not created by apply_actions.
+    def changed_cells(self) -> Optional[List[Tuple[int, int]]]:
+        return self.__changed
+
+    # The following methods support searching on a single board that is modified in place.
+    # A mutable board records every replaced cell on an undo trail, so a search can take a mark
+    # before trying a value and roll the board back to it afterwards, instead of copying boards.
+    def mutable_copy(self) -> Board:
+        ret_board = Board(self.__max_val, False)
+        ret_board.__board = [row[:] for row in self.__board]
+        ret_board.__trail = []
+        ret_board.__is_locked = False
+
+        return ret_board
+
+    def apply_actions_in_place(self, actions: List[Action]):
+        if self.__is_locked:
+            raise PermissionError("Cannot modify a board once it is locked!")
+
+        for act in actions:
+            act.apply_action(self)
+
+    def trail_mark(self) -> int:
+        return len(self.__trail)
+
+    # The coordinates of the cells changed since the given trail mark, which may contain repeats.
+    # These are also the cells that undo_to(mark) will change back.
+    def trail_cells(self, mark: int) -> List[Tuple[int, int]]:
+        return [(cell.x(), cell.y()) for cell in self.__trail[mark:]]
+
+    def undo_to(self, mark: int):
+        trail = self.__trail
+        board = self.__board
+
+        while len(trail) > mark:
+            cell = trail.pop()
+            board[cell.x()][cell.y()] = cell
+
+    # Returns a locked copy of the board, which is safe to keep after the board is modified further.
+    def locked_copy(self) -> Board:
+        ret_board = Board(self.__max_val, False)
+        ret_board.__board = [row[:] for row in self.__board]
+
+        return ret_board
+
     def __str__(self):
 
         result_str = ''
@@ -1,11 +1,44 @@
 
 from __future__ import annotations
 import math
-from typing import List, FrozenSet, Optional
+from typing import Iterable, Iterator, List, FrozenSet, Optional, Set
 
 from .board import Board
 
 
+# Possible values are stored as an integer bitmask, where bit (value - 1) is set
+# if value is still a candidate for the cell.  These helpers convert between the two forms.
+def value_bit(value: int) -> int:
+    return 1 << (value - 1)
+
+
+def full_mask(max_val: int) -> int:
+    return (1 << max_val) - 1
+
+
+def vals_to_mask(vals: Iterable[int]) -> int:
+    mask = 0
+    for val in vals:
+        mask |= 1 << (val - 1)
+    return mask
+
+
+def mask_to_vals(mask: int) -> Iterator[int]:
+    # Walks the set bits from lowest to highest, so values come out in ascending order.
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length()
+        mask ^= low_bit
+
+
+if hasattr(int, 'bit_count'):
+    def popcount(mask: int) -> int:
+        return mask.bit_count()
+else:
+    def popcount(mask: int) -> int:
+        return bin(mask).count('1')
+
+
 class Cell:
 
     __max_val: int = None
@@ -13,11 +46,11 @@ class Cell:
     __x: int
     __y: int
     __value: int = None  # Note: X and Y coordinates are 0-indexes, whereas the values themselves start at 1.
-    __poss_vals: FrozenSet[int] = None
+    __poss_mask: int = None
     __is_initial: bool
 
     def __init__(self, max_val: int, x: int, y: int, cur_val: int = None,
-                 poss_vals: FrozenSet[int] = None, is_initial: bool = False):
+                 poss_vals: FrozenSet[int] = None, is_initial: bool = False, poss_mask: int = None):
 
         # Parameter Validation
         if max_val is None or max_val <= 1:
@@ -31,7 +64,10 @@ class Cell:
         if y is None or y < 0 or y >= max_val:
             raise ValueError("y must be set and 0 <= y < max_val.")
 
-        if cur_val is not None and poss_vals is not None:
+        if poss_vals is not None and poss_mask is not None:
+            raise ValueError("Only one of poss_vals and poss_mask can be set!")
+
+        if cur_val is not None and (poss_vals is not None or poss_mask is not None):
             raise ValueError("Only one of cur_val and poss_vals can be set!")
 
         if is_initial and cur_val is None:
@@ -54,8 +90,13 @@ class Cell:
 
             return
 
-        if poss_vals is None:
-            self.__poss_vals = frozenset(x for x in range(1, max_val + 1))
+        if poss_mask is not None:
+            if poss_mask < 0 or poss_mask > full_mask(max_val):
+                raise ValueError("poss_mask contained a value outside of 1 to max_val")
+
+            self.__poss_mask = poss_mask
+        elif poss_vals is None:
+            self.__poss_mask = full_mask(max_val)
         else:
             for x in poss_vals:
                 if x < 1:
@@ -63,7 +104,7 @@ class Cell:
                 elif x > max_val:
                     raise ValueError("poss_vals contained a number greater than max_val")
 
-            self.__poss_vals = poss_vals
+            self.__poss_mask = vals_to_mask(poss_vals)
 
     def value(self) -> int:
         return self.__value
@@ -111,33 +152,44 @@ class Cell:
     def display_value(self) -> str:
         return self.val_to_chr(self.__value)
 
-    def possible_vals(self) -> Optional[FrozenSet[int]]:
-        if self.__poss_vals is not None:
-            return self.__poss_vals
+    # Returns a new set on every call, so callers are free to modify it.
+    def possible_vals(self) -> Optional[Set[int]]:
+        if self.__poss_mask is not None:
+            return set(mask_to_vals(self.__poss_mask))
         else:
             return None
 
+    # Returns the possible values as a bitmask, or 0 if the cell has a value.
+    def possible_mask(self) -> int:
+        if self.__poss_mask is not None:
+            return self.__poss_mask
+        else:
+            return 0
+
     def has_possible_val(self, test_val: int) -> bool:
         if self.__value is not None:
             return False
 
-        return test_val in self.__poss_vals
+        if test_val < 1 or test_val > self.__max_val:
+            return False
+
+        return (self.__poss_mask >> (test_val - 1)) & 1 == 1
 
     def display_possible_vals(self) -> List[str]:
-        return [self.val_to_chr(x) for x in self.__poss_vals]
+        return [self.val_to_chr(x) for x in mask_to_vals(self.__poss_mask)]
 
     def possible_count(self) -> int:
         if self.__value is not None:
             return -1
 
-        return len(self.__poss_vals)
+        return popcount(self.__poss_mask)
 
     def __repr__(self) -> str:
         ret_str = "Cell(%d): (%d,%d) " % (self.__max_val, self.__x, self.__y)
         if self.__value is not None:
             ret_str += "value: " + str(self.__value)
         else:
-            ret_str += "possibilities: " + str(self.__poss_vals)
+            ret_str += "possibilities: " + str(self.possible_vals())
 
         return ret_str
 
@@ -148,7 +200,7 @@ class Cell:
         if self.__value == value:
             return self
 
-        if self.__value is None and value not in self.__poss_vals:
+        if self.__value is None and not self.has_possible_val(value):
             return self
 
         return Cell(self.__max_val, self.__x, self.__y, is_initial=is_initial, cur_val=value)
@@ -169,13 +221,14 @@ class Cell:
         if self.__value is not None:
             return self
 
-        if value in self.__poss_vals:
-            return self
-
         if value < 1 or value > self.__max_val:
             raise ValueError("Cannot set a possible value outside of value range!")
 
-        new_cell = Cell(self.__max_val, self.__x, self.__y, poss_vals=self.__poss_vals.union({value}))
+        bit = value_bit(value)
+        if self.__poss_mask & bit:
+            return self
+
+        new_cell = Cell(self.__max_val, self.__x, self.__y, poss_mask=self.__poss_mask | bit)
 
         return new_cell
 
@@ -186,10 +239,10 @@ class Cell:
         if self.__value is not None:
             return self
 
-        if value not in self.__poss_vals:
+        if not self.has_possible_val(value):
             return self
 
-        new_cell = Cell(self.__max_val, self.__x, self.__y, poss_vals=self.__poss_vals.difference({value}))
+        new_cell = Cell(self.__max_val, self.__x, self.__y, poss_mask=self.__poss_mask & ~value_bit(value))
 
         return new_cell
 
@@ -200,16 +253,13 @@ class Cell:
         if self.__value is not None:
             return self
 
-        link_cells = board.linked_cells(self.__x, self.__y)
-        link_cells.remove(self)
-
-        new_poss = set(x + 1 for x in range(self.__max_val))
+        new_poss = full_mask(self.__max_val)
 
-        for cell in link_cells:
+        for cell in board.peer_cells(self.__x, self.__y):
             val = cell.value()
             if val is not None:
-                new_poss.remove(val)
+                new_poss &= ~value_bit(val)
 
-        new_cell = Cell(self.__max_val, self.__x, self.__y, poss_vals=frozenset(new_poss))
+        new_cell = Cell(self.__max_val, self.__x, self.__y, poss_mask=new_poss)
 
         return new_cell
@@ -0,0 +1,89 @@
+
+import argparse
+import sys
+from collections import deque
+from typing import Deque, Iterator, List, TextIO, Tuple
+
+from model.batch import solve_many
+from model.lockstep import ENGINE_LOCKSTEP
+from model.solver import ENGINE_DLX, ENGINE_RECURSIVE, ENGINE_TENSOR, ENGINE_TRAIL
+
+
+# Headless command line solver, run as: python -m model [puzzle file]
+#
+# Puzzles are read one per line, in any format create_board_from_string accepts.  Blank lines and lines
+# starting with # are skipped.  Each puzzle's solution is written on its own line, in input order, in the
+# str(Board) format.  Puzzles that can't be solved produce an empty line, with the reason on stderr.
+# Only a few chunks of puzzles are held in memory at once, so this works on arbitrarily large inputs.
+# Nothing in here imports the GUI.
+
+def _read_puzzles(lines: TextIO, line_numbers: Deque[int]) -> Iterator[str]:
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+
+        if len(line) == 0 or line.startswith('#'):
+            continue
+
+        line_numbers.append(line_number)
+        yield line
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m model", description="Solve sudoku puzzles, one per line.")
+    parser.add_argument("input", nargs="?", default="-", help="Puzzle file to read, or - for stdin (the default).")
+    parser.add_argument("-o", "--output", default="-", help="File to write solutions to, or - for stdout.")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Number of solver processes. 1 solves in this process, 0 uses every core.")
+    parser.add_argument("-c", "--chunksize", type=int, default=64, help="Puzzles sent to a worker at a time.")
+    parser.add_argument("-e", "--engine", default=ENGINE_DLX,
+                        choices=[ENGINE_DLX, ENGINE_TRAIL, ENGINE_RECURSIVE, ENGINE_TENSOR, ENGINE_LOCKSTEP],
+                        help="Solver engine to use.")
+
+    return parser.parse_args(argv)
+
+
+def _open_streams(args: argparse.Namespace) -> Tuple[TextIO, TextIO]:
+    if args.input == "-":
+        input_file = sys.stdin
+    else:
+        input_file = open(args.input, "r")
+
+    if args.output == "-":
+        output_file = sys.stdout
+    else:
+        output_file = open(args.output, "w")
+
+    return input_file, output_file
+
+
+def main(argv: List[str] = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    input_file, output_file = _open_streams(args)
+
+    # The line number of every puzzle that has been read, but not yet written out.
+    line_numbers: Deque[int] = deque()
+    failures = 0
+
+    try:
+        puzzles = _read_puzzles(input_file, line_numbers)
+        workers = args.workers if args.workers > 0 else None
+
+        for result in solve_many(puzzles, workers=workers, chunksize=args.chunksize, engine=args.engine):
+            line_number = line_numbers.popleft()
+
+            if result.solution is None:
+                failures += 1
+                print("line %d: %s" % (line_number, result.error), file=sys.stderr)
+                output_file.write("\n")
+            else:
+                output_file.write(result.solution + "\n")
+
+        output_file.flush()
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    return 1 if failures > 0 else 0
@@ -0,0 +1,177 @@
+
+from typing import Iterator, List, Sequence
+
+
+# The DancingLinks class is an implementation of Knuth's Algorithm X, using dancing links.
+# The exact cover matrix is stored as a toroidal doubly linked list of its set entries, where every
+# node is an index into the parallel left/right/up/down lists below.  Node 0 is the root header,
+# and nodes 1 to num_columns are the column headers.
+#
+# Columns are numbered 0 to num_columns - 1, and every row is tagged with a caller supplied id,
+# which is what the search returns for each row in a solution.
+class DancingLinks:
+
+    __num_columns: int
+    __left: List[int]
+    __right: List[int]
+    __up: List[int]
+    __down: List[int]
+    __column: List[int]
+    __row_id: List[int]
+    __size: List[int]
+
+    def __init__(self, num_columns: int):
+        header_count = num_columns + 1
+
+        self.__num_columns = num_columns
+        self.__left = [i - 1 for i in range(header_count)]
+        self.__left[0] = num_columns
+        self.__right = [i + 1 for i in range(header_count)]
+        self.__right[num_columns] = 0
+        self.__up = list(range(header_count))
+        self.__down = list(range(header_count))
+        self.__column = list(range(header_count))
+        self.__row_id = [-1] * header_count
+        self.__size = [0] * header_count
+
+    def num_columns(self) -> int:
+        return self.__num_columns
+
+    def add_row(self, row_id: int, columns: Sequence[int]):
+        left, right, up, down = self.__left, self.__right, self.__up, self.__down
+
+        first = None
+        for col in columns:
+            header = col + 1
+            node = len(left)
+
+            # Insert the node at the bottom of its column.
+            up.append(up[header])
+            down.append(header)
+            down[up[header]] = node
+            up[header] = node
+
+            if first is None:
+                first = node
+                left.append(node)
+                right.append(node)
+            else:
+                left.append(left[first])
+                right.append(first)
+                right[left[first]] = node
+                left[first] = node
+
+            self.__column.append(header)
+            self.__row_id.append(row_id)
+            self.__size[header] += 1
+
+    def __cover(self, header: int):
+        left, right, up, down, column, size = \
+            self.__left, self.__right, self.__up, self.__down, self.__column, self.__size
+
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def __uncover(self, header: int):
+        left, right, up, down, column, size = \
+            self.__left, self.__right, self.__up, self.__down, self.__column, self.__size
+
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+
+        right[left[header]] = header
+        left[right[header]] = header
+
+    # Yields the row ids of every exact cover, stopping after limit covers if a limit is given.
+    # The search always branches on the column with the fewest rows left, and uses an explicit stack
+    # of chosen row nodes rather than recursion.  The matrix is restored once the iterator finishes.
+    def search(self, limit: int = None) -> Iterator[List[int]]:
+        left, right, down, column, size, row_id = \
+            self.__left, self.__right, self.__down, self.__column, self.__size, self.__row_id
+        cover, uncover = self.__cover, self.__uncover
+
+        found = 0
+        chosen: List[int] = []
+
+        while True:
+
+            # Descend: branch on the column with the fewest rows, trying its first row.
+            if right[0] == 0:
+                yield [row_id[node] for node in chosen]
+
+                found += 1
+                if limit is not None and found >= limit:
+                    break
+            else:
+                header = right[0]
+                best = header
+                best_size = size[header]
+                while header != 0 and best_size > 1:
+                    if size[header] < best_size:
+                        best = header
+                        best_size = size[header]
+                    header = right[header]
+
+                if best_size > 0:
+                    cover(best)
+                    node = down[best]
+                    chosen.append(node)
+
+                    j = right[node]
+                    while j != node:
+                        cover(column[j])
+                        j = right[j]
+                    continue
+
+            # Backtrack: move the most recent choice to the next row in its column.
+            while len(chosen) > 0:
+                node = chosen.pop()
+
+                j = left[node]
+                while j != node:
+                    uncover(column[j])
+                    j = left[j]
+
+                header = column[node]
+                node = down[node]
+
+                if node != header:
+                    chosen.append(node)
+
+                    j = right[node]
+                    while j != node:
+                        cover(column[j])
+                        j = right[j]
+                    break
+
+                uncover(header)
+            else:
+                return
+
+        # Stopped early, restore the matrix.
+        while len(chosen) > 0:
+            node = chosen.pop()
+
+            j = left[node]
+            while j != node:
+                uncover(column[j])
+                j = left[j]
+
+            uncover(column[node])
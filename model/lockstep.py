@@ -0,0 +1,181 @@
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+
+from model.board import create_board_from_values
+from model.solver import ENGINE_DLX, solve_board
+
+# NumPy is optional, and only needed once solve_lockstep is called.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The batch engine that solve_many can use, see solve_lockstep.  Puzzles left over go to a solve_board engine.
+ENGINE_LOCKSTEP = "lockstep"
+
+_VALUE_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The lockstep engine requires numpy, which is not installed.")
+
+
+# Maps every byte of a puzzle string to its value, the same way Cell.chr_to_val does, with -1 for anything else.
+def _char_values() -> np.ndarray:
+    table = np.full(256, -1, dtype=np.int64)
+
+    for val, char in enumerate(_VALUE_CHARS):
+        table[ord(char)] = val
+        table[ord(char.lower())] = val
+
+    return table
+
+
+# Decodes puzzle strings that all have max_val * max_val values into a (puzzles, row, col) array of values,
+# with 0 for empty cells.  Raises ValueError if any of them holds a character or value that is not allowed.
+def _decode_puzzles(puzzles: Sequence[str], max_val: int) -> np.ndarray:
+    raw = "".join(puzzles).encode("ascii", errors="replace")
+    values = _char_values()[np.frombuffer(raw, dtype=np.uint8)].reshape(len(puzzles), max_val, max_val)
+
+    if (values < 0).any() or (values > max_val).any():
+        raise ValueError("Puzzle contains a value outside of 0 to %d" % max_val)
+
+    return values
+
+
+# Encodes solved boards back into the str(Board) format: each row's values followed by a comma.
+def _encode_boards(values: np.ndarray) -> List[str]:
+    num_boards, max_val = values.shape[0], values.shape[1]
+
+    chars = np.frombuffer(_VALUE_CHARS.encode("ascii"), dtype=np.uint8)[values]
+    commas = np.full((num_boards, max_val, 1), ord(","), dtype=np.uint8)
+    encoded = np.concatenate([chars, commas], axis=2).tobytes().decode("ascii")
+
+    board_len = max_val * (max_val + 1)
+    return [encoded[i * board_len:(i + 1) * board_len] for i in range(num_boards)]
+
+
+# The values placed in each row, column and quadrant of a (puzzles, row, col, value) one hot array,
+# each counted and broadcastable back against the array.
+def _unit_counts(cells: np.ndarray, max_sqrt: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    num_boards, max_val = cells.shape[0], cells.shape[1]
+    quadrants = cells.reshape(num_boards, max_val // max_sqrt, max_sqrt, max_val // max_sqrt, max_sqrt, max_val)
+
+    row_counts = cells.sum(axis=2, keepdims=True, dtype=np.int64)
+    col_counts = cells.sum(axis=1, keepdims=True, dtype=np.int64)
+    quadrant_counts = quadrants.sum(axis=(2, 4), keepdims=True, dtype=np.int64)
+
+    return row_counts, col_counts, quadrant_counts
+
+
+# Runs singles and hidden singles on every board at once, until each board is solved, found to be invalid, or stuck.
+# values is a (puzzles, row, col) array of the given values, and is filled in place.
+# Returns a (puzzles,) array that is 1 for solved boards, -1 for invalid boards, and 0 for boards that need a search.
+def _propagate(values: np.ndarray, max_sqrt: int) -> np.ndarray:
+    num_boards, max_val = values.shape[0], values.shape[1]
+    value_range = np.arange(1, max_val + 1)
+
+    status = np.zeros(num_boards, dtype=np.int64)
+
+    # The givens are placed like any other value, which rules out their peers and catches repeated givens.
+    place = values[..., np.newaxis] == value_range
+    candidates = np.ones((num_boards, max_val, max_val, max_val), dtype=bool)
+    active = np.arange(num_boards)
+
+    while len(active) > 0:
+        cur_values = values[active]
+        quadrant_shape = (len(active), max_val // max_sqrt, max_sqrt, max_val // max_sqrt, max_sqrt, max_val)
+
+        # Two values for one cell, or one value twice in a unit, means the board is invalid.
+        row_counts, col_counts, quadrant_counts = _unit_counts(place, max_sqrt)
+        invalid = (place.sum(axis=3) > 1).any(axis=(1, 2)) | \
+            (row_counts > 1).any(axis=(1, 2, 3)) | \
+            (col_counts > 1).any(axis=(1, 2, 3)) | \
+            (quadrant_counts > 1).any(axis=(1, 2, 3, 4, 5))
+
+        placed_cells = place.any(axis=3)
+        cur_values[placed_cells] = place.argmax(axis=3)[placed_cells] + 1
+
+        candidates &= ~placed_cells[..., np.newaxis]
+        candidates &= row_counts == 0
+        candidates &= col_counts == 0
+        quadrant_candidates = candidates.reshape(quadrant_shape)
+        quadrant_candidates &= quadrant_counts == 0
+
+        # A cell with no values left, or a value with nowhere left to go in a unit, also means the board is invalid.
+        empty = cur_values == 0
+        have = candidates | (cur_values[..., np.newaxis] == value_range)
+        invalid |= (empty & ~candidates.any(axis=3)).any(axis=(1, 2)) | \
+            ~have.any(axis=2).all(axis=(1, 2)) | \
+            ~have.any(axis=1).all(axis=(1, 2)) | \
+            ~have.reshape(quadrant_shape).any(axis=(2, 4)).all(axis=(1, 2, 3))
+
+        values[active] = cur_values
+
+        # Singles, then hidden singles in rows, columns and quadrants, all found at once.
+        row_counts, col_counts, quadrant_counts = _unit_counts(candidates, max_sqrt)
+        place = candidates & (candidates.sum(axis=3, keepdims=True) == 1)
+        place |= candidates & (row_counts == 1)
+        place |= candidates & (col_counts == 1)
+        place |= (candidates.reshape(quadrant_shape) & (quadrant_counts == 1)).reshape(candidates.shape)
+
+        solved = ~empty.any(axis=(1, 2)) & ~invalid
+        stuck = ~place.any(axis=(1, 2, 3)) & ~solved & ~invalid
+
+        status[active[solved]] = 1
+        status[active[invalid]] = -1
+
+        keep = ~(solved | invalid | stuck)
+        active = active[keep]
+        place = place[keep]
+        candidates = candidates[keep]
+
+    return status
+
+
+def _puzzle_size(puzzle: str) -> int:
+    max_val = math.isqrt(len(puzzle))
+
+    if max_val <= 1 or max_val * max_val != len(puzzle) or \
+            (max_val != 2 and math.isqrt(max_val) * math.isqrt(max_val) != max_val):
+        raise ValueError("Puzzle is not a square board: %r" % puzzle)
+
+    return max_val
+
+
+# Solves a batch of puzzle strings in lockstep, and returns the solutions in the str(Board) format,
+# with None for the puzzles that have no solution.
+#
+# Puzzles are stacked into one NumPy array per board size, and the singles and hidden singles rules run on all of
+# them at once as array operations, so there are no Board, Cell or Action objects for the many puzzles these rules
+# solve.  Only the puzzles that are still unsolved after that are built into a Board and solved with engine.
+# Every puzzle must be in a format create_board_from_string accepts, otherwise this raises ValueError.
+def solve_lockstep(puzzles: Sequence[str], engine: str = ENGINE_DLX) -> List[Optional[str]]:
+    _require_numpy()
+
+    solutions: List[Optional[str]] = [None] * len(puzzles)
+
+    by_size: Dict[int, List[int]] = {}
+    cleaned = [puzzle.replace(",", "") for puzzle in puzzles]
+    for index, puzzle in enumerate(cleaned):
+        by_size.setdefault(_puzzle_size(puzzle), []).append(index)
+
+    for max_val, indexes in by_size.items():
+        values = _decode_puzzles([cleaned[index] for index in indexes], max_val)
+        status = _propagate(values, max(1, math.isqrt(max_val)))
+
+        encoded = _encode_boards(values)
+        for index, board_status, board_values, board_str in zip(indexes, status.tolist(), values.tolist(), encoded):
+            if board_status == 1:
+                solutions[index] = board_str
+            elif board_status == 0:
+                board, init_actions = create_board_from_values(
+                    max_val, [[val or None for val in row] for row in board_values])
+                board = solve_board(board, engine)
+
+                if board.is_solved():
+                    solutions[index] = str(board)
+
+    return solutions
@@ -1,30 +1,104 @@
 
-import itertools
-from typing import List, Set, Tuple
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from model.action import *
 from model.board import Board
-from model.cell import Cell
+from model.cell import Cell, mask_to_vals, popcount
 
 # Each of these rules are methods of determining which values should be put into
 # Cells in a Sudoku board.  The rules are guaranteed to be correct, and unique.
 # Rules generate a list of values to be added to the board,
 # or a list of possible values to be eliminated from contention.
 # Returns ( List of actions to take )
+#
+# Rules also take an optional set of dirty cells: the (x, y) coordinates of every cell that changed since the rule
+# last ran and found nothing.  Rules that only look at single units use it to skip the units that can't have changed
+# their result, see DirtyTracker.  A rule given None, or one that does not support this, examines the whole board.
+
+Coord = Tuple[int, int]
+Rule = Callable[[Board, Optional[Set[Coord]]], List[Action]]
+
+
+# The DirtyTracker class keeps, for every rule, the cells changed since that rule last ran and returned no actions.
+# Solvers mark the cells changed by every step (and by every undo), and pass the tracker to _get_next_steps.
+# A rule that has never run, or has found actions since, is given the cells changed since then, which is safe
+# because its result for a unit can only change when a cell in that unit changes.
+class DirtyTracker:
+
+    __dirty: Dict[Rule, Set[Coord]]
+
+    def __init__(self):
+        # A rule without an entry has never been run, so all of its cells are dirty.
+        self.__dirty = {}
+
+    def dirty_cells(self, rule: Rule) -> Optional[Set[Coord]]:
+        return self.__dirty.get(rule)
+
+    def mark(self, cells: Optional[Iterable[Coord]]):
+        if cells is None:
+            self.__dirty.clear()
+            return
+
+        cells = set(cells)
+        for dirty in self.__dirty.values():
+            dirty.update(cells)
+
+    # Called when a rule has examined its dirty cells without finding any actions.
+    def mark_clean(self, rule: Rule):
+        self.__dirty[rule] = set()
+
+    def copy(self) -> DirtyTracker:
+        ret_tracker = DirtyTracker()
+        ret_tracker.__dirty = {rule: set(dirty) for rule, dirty in self.__dirty.items()}
+
+        return ret_tracker
+
+
+# These return the units a rule has to examine, given its dirty cells.
+def _rows_to_check(board: Board, dirty_cells: Optional[Set[Coord]]) -> Iterable[int]:
+    if dirty_cells is None:
+        return range(board.max_val())
+    else:
+        return sorted(set(x for x, y in dirty_cells))
+
+
+def _cols_to_check(board: Board, dirty_cells: Optional[Set[Coord]]) -> Iterable[int]:
+    if dirty_cells is None:
+        return range(board.max_val())
+    else:
+        return sorted(set(y for x, y in dirty_cells))
+
+
+# Returns the top left coordinate of each quadrant, in row-major order.
+def _quadrants_to_check(board: Board, dirty_cells: Optional[Set[Coord]]) -> Iterable[Coord]:
+    max_val = board.max_val()
+    max_sqrt = board.max_sqrt()
+
+    if dirty_cells is None:
+        return [(quadrant_x, quadrant_y)
+                for quadrant_x in range(0, max_val, max_sqrt)
+                for quadrant_y in range(0, max_val, max_sqrt)]
+    else:
+        return sorted(set((x - x % max_sqrt, y - y % max_sqrt) for x, y in dirty_cells))
 
 
 # This rule check for cells that only have one possible value
 # NOTE:  There is an issue where invalid puzzles will attempt
 # to set two adjacent cells to the same value, because the number
 # is the only possible number for both cells.
-def rule_one_possible(board: Board) -> List[Action]:
+def rule_one_possible(board: Board, dirty_cells: Set[Coord] = None) -> List[Action]:
 
     action_arr = []
 
-    for cell in board.all_cells():
+    if dirty_cells is None:
+        cells = board.all_cells()
+    else:
+        cells = [board.get_cell(x, y) for x, y in sorted(dirty_cells)]
+
+    for cell in cells:
         if cell.possible_count() == 1:
-            for result_val in cell.possible_vals():
-                action_arr.append(SetAction(cell.x(), cell.y(), result_val))
+            action_arr.append(SetAction(cell.x(), cell.y(), cell.possible_mask().bit_length()))
 
     return action_arr
 
@@ -32,37 +106,41 @@ def rule_one_possible(board: Board) -> List[Action]:
 # This set of rules checks to see if there is only one possible location
 # for a value in a set of cells. IE:  If there is only one spot for 1 to be placed in a row.
 # This rule applies for rows, columns, and quadrants.
-def _rule_exclusive_set(cell_list: Set[Cell]) -> List[Action]:
+#
+# One pass over the cells tallies which values can go in at least one cell, and which in more than one,
+# which leaves the values with exactly one location.  A cell gets a SetAction if exactly one of its
+# values is among them (a cell with two such values means the board is invalid).
+def _rule_exclusive_set(cell_list: List[Cell]) -> List[Action]:
 
     ret_arr = []
 
-    for cell in cell_list:
-        cur_cell_poss = cell.possible_vals()
-
-        for poss_cell in cell_list:
+    seen_once = 0
+    seen_multiple = 0
 
-            if cell == poss_cell:
-                continue
+    for cell in cell_list:
+        cell_poss = cell.possible_mask()
+        seen_multiple |= seen_once & cell_poss
+        seen_once |= cell_poss
 
-            if len(cur_cell_poss) == 0:
-                break
+    exclusive_vals = seen_once & ~seen_multiple
 
-            temp_poss = poss_cell.possible_vals()
+    if exclusive_vals == 0:
+        return ret_arr
 
-            cur_cell_poss = cur_cell_poss.difference(temp_poss)
+    for cell in cell_list:
+        cur_cell_poss = cell.possible_mask() & exclusive_vals
 
-        if len(cur_cell_poss) == 1:
-            for result_val in cur_cell_poss:
-                ret_arr.append(SetAction(cell.x(), cell.y(), result_val))
+        if cur_cell_poss != 0 and popcount(cur_cell_poss) == 1:
+            ret_arr.append(SetAction(cell.x(), cell.y(), cur_cell_poss.bit_length()))
 
     return ret_arr
 
 
-def rule_row_exclusive(board: Board) -> List[Action]:
+def rule_row_exclusive(board: Board, dirty_cells: Set[Coord] = None) -> List[Action]:
 
     action_arr = []
 
-    for x in range(board.max_val()):
+    for x in _rows_to_check(board, dirty_cells):
         cur_row = board.row_cells(x, True)
 
         action_arr.extend(_rule_exclusive_set(cur_row))
@@ -70,11 +148,11 @@ def rule_row_exclusive(board: Board) -> List[Action]:
     return action_arr
 
 
-def rule_col_exclusive(board: Board) -> List[Action]:
+def rule_col_exclusive(board: Board, dirty_cells: Set[Coord] = None) -> List[Action]:
 
     action_arr = []
 
-    for y in range(board.max_val()):
+    for y in _cols_to_check(board, dirty_cells):
         cur_col = board.col_cells(y, True)
 
         action_arr.extend(_rule_exclusive_set(cur_col))
@@ -82,44 +160,49 @@ def rule_col_exclusive(board: Board) -> List[Action]:
     return action_arr
 
 
-def rule_quadrant_exclusive(board: Board) -> List[Action]:
+def rule_quadrant_exclusive(board: Board, dirty_cells: Set[Coord] = None) -> List[Action]:
 
     action_arr = []
 
-    max_val = board.max_val()
-    max_sqrt = board.max_sqrt()
+    for quadrant_x, quadrant_y in _quadrants_to_check(board, dirty_cells):
 
-    for quadrant_x in range(0, max_val, max_sqrt):
+        quadrant_cells = board.quadrant_cells(quadrant_x, quadrant_y, True)
 
-        for quadrant_y in range(0, max_val, max_sqrt):
+        action_arr.extend(_rule_exclusive_set(quadrant_cells))
 
-            quadrant_cells = board.quadrant_cells(quadrant_x, quadrant_y, True)
+    return action_arr
 
-            action_arr.extend(_rule_exclusive_set(quadrant_cells))
 
-    return action_arr
+# Given the candidate masks of the segments a line of cells is split into, returns for every segment the values
+# whose candidates all sit in that segment alone.  This is the same seen once / seen multiple tally as above.
+def _confined_segment_masks(segment_masks: List[int]) -> List[int]:
 
+    seen_once = 0
+    seen_multiple = 0
 
-def _quadrant_col_cell_elim_helper(quadrant_cells: Set[Cell], col_cells: Set[Cell]) -> List[Action]:
+    for mask in segment_masks:
+        seen_multiple |= seen_once & mask
+        seen_once |= mask
 
-    action_arr = []
+    confined = seen_once & ~seen_multiple
 
-    intersection_cells = quadrant_cells.intersection(col_cells)
-    quadrant_exclusive_cells = quadrant_cells.difference(col_cells)
-    column_exclusive_cells = col_cells.difference(quadrant_cells)
+    return [mask & confined for mask in segment_masks]
 
-    column_elim = set()
-    for cell in intersection_cells:
-        column_elim = column_elim.union(cell.possible_vals())
 
-    for cell in quadrant_exclusive_cells:
-        column_elim = column_elim.difference(cell.possible_vals())
+def _elim_from_cells(cells: Iterable[Cell], elim_mask: int, found: Set[Tuple[int, int, int]]) -> List[Action]:
 
-    for cell in column_exclusive_cells:
-        cur_cell_elim = cell.possible_vals().intersection(column_elim)
+    action_arr = []
+
+    for cell in cells:
+        cur_cell_elim = cell.possible_mask() & elim_mask
+        if cur_cell_elim == 0:
+            continue
 
-        for elim_val in cur_cell_elim:
-            action_arr.append(ClearPossibleAction(cell.x(), cell.y(), elim_val))
+        for elim_val in mask_to_vals(cur_cell_elim):
+            key = (cell.x(), cell.y(), elim_val)
+            if key not in found:
+                found.add(key)
+                action_arr.append(ClearPossibleAction(cell.x(), cell.y(), elim_val))
 
     return action_arr
 
@@ -135,97 +218,272 @@ def _quadrant_col_cell_elim_helper(quadrant_cells: Set[Cell], col_cells: Set[Cel
 # quadrants in the p column.  We know this is safe, because the value MUST be in
 # one of those two positions outlined, so we can eliminate the possible value from
 # the remainder of the column.  This rule attempts to do this for both rows and columns.
-def rule_quadrant_col_and_row_elim_possible(board: Board) -> List[Action]:
+#
+# The reverse also holds: if a value's only spots in a row (or column) are all inside one quadrant,
+# the value can be eliminated from the rest of that quadrant.
+#
+# Both directions OR the candidates of each row and column segment of a quadrant together in one pass over the
+# board, and only look at the cells to eliminate from when a value's span collapses to a single segment.
+# The rule always examines the whole board, since its result for a quadrant depends on every line through it.
+def rule_quadrant_col_and_row_elim_possible(board: Board, dirty_cells: Set[Coord] = None) -> List[Action]:
 
     action_arr = []
 
     max_val = board.max_val()
     max_sqrt = board.max_sqrt()
 
-    for quadrant_x in range(0, max_val, max_sqrt):
+    # Quadrants that are not square don't hold every value, so nothing can be said about them.
+    if max_sqrt * max_sqrt != max_val:
+        return action_arr
 
-        for quadrant_y in range(0, max_val, max_sqrt):
+    rows = [board.row_cells(x) for x in range(max_val)]
+    masks = [[cell.possible_mask() for cell in row] for row in rows]
 
-            quadrant_cells = board.quadrant_cells(quadrant_x, quadrant_y, True)
-            if len(quadrant_cells) == 0:
-                continue
+    # row_segment_masks[x][q] and col_segment_masks[y][q] are the candidates of row x and column y inside
+    # the q'th quadrant they pass through.
+    row_segment_masks = [[0] * max_sqrt for _ in range(max_val)]
+    col_segment_masks = [[0] * max_sqrt for _ in range(max_val)]
 
-            for col_y in range(quadrant_y, quadrant_y + max_sqrt):
-                col_cells = board.col_cells(col_y, True)
-                if len(col_cells) == 0:
-                    continue
+    for x in range(max_val):
+        row_masks = masks[x]
+        row_segments = row_segment_masks[x]
+        quadrant_row = x // max_sqrt
 
-                action_arr.extend(_quadrant_col_cell_elim_helper(quadrant_cells, col_cells))
+        for y in range(max_val):
+            mask = row_masks[y]
+            row_segments[y // max_sqrt] |= mask
+            col_segment_masks[y][quadrant_row] |= mask
 
-            for row_x in range(quadrant_x, quadrant_x + max_sqrt):
-                row_cells = board.row_cells(row_x, True)
-                if len(row_cells) == 0:
-                    continue
+    found: Set[Tuple[int, int, int]] = set()
 
-                action_arr.extend(_quadrant_col_cell_elim_helper(quadrant_cells, row_cells))
+    # A value confined to one row (or column) of a quadrant is eliminated from the rest of that line.
+    for quadrant_x in range(0, max_val, max_sqrt):
+        for quadrant_y in range(0, max_val, max_sqrt):
+            quadrant_cols = range(quadrant_y, quadrant_y + max_sqrt)
+            quadrant_rows = range(quadrant_x, quadrant_x + max_sqrt)
+
+            row_confined = _confined_segment_masks(
+                [row_segment_masks[x][quadrant_y // max_sqrt] for x in quadrant_rows])
+            for x, elim_mask in zip(quadrant_rows, row_confined):
+                if elim_mask != 0:
+                    action_arr.extend(_elim_from_cells(
+                        (cell for cell in rows[x] if cell.y() not in quadrant_cols), elim_mask, found))
+
+            col_confined = _confined_segment_masks(
+                [col_segment_masks[y][quadrant_x // max_sqrt] for y in quadrant_cols])
+            for y, elim_mask in zip(quadrant_cols, col_confined):
+                if elim_mask != 0:
+                    action_arr.extend(_elim_from_cells(
+                        (rows[x][y] for x in range(max_val) if x not in quadrant_rows), elim_mask, found))
+
+    # A value confined to one quadrant within a row (or column) is eliminated from the rest of that quadrant.
+    for x in range(max_val):
+        for segment, elim_mask in enumerate(_confined_segment_masks(row_segment_masks[x])):
+            if elim_mask != 0:
+                quadrant_cells = board.quadrant_cells(x, segment * max_sqrt)
+                action_arr.extend(_elim_from_cells(
+                    (cell for cell in quadrant_cells if cell.x() != x), elim_mask, found))
+
+    for y in range(max_val):
+        for segment, elim_mask in enumerate(_confined_segment_masks(col_segment_masks[y])):
+            if elim_mask != 0:
+                quadrant_cells = board.quadrant_cells(segment * max_sqrt, y)
+                action_arr.extend(_elim_from_cells(
+                    (cell for cell in quadrant_cells if cell.y() != y), elim_mask, found))
 
     return action_arr
 
 
+# The largest naked or hidden subset that the combination rules look for.
+subset_max_size = 4
+
+
+# Yields every combination of size indexes into masks whose masks have a union of at most size bits,
+# along with that union.  Masks with more than size bits can never be part of one, and each branch of the search
+# is dropped as soon as its union grows past size bits, so this stays cheap even for 25 cell units.
+def _small_union_combinations(masks: List[int], size: int) -> Iterator[Tuple[Tuple[int, ...], int]]:
+
+    candidates = [i for i, mask in enumerate(masks) if 0 < popcount(mask) <= size]
+    chosen = []
+
+    def search(start: int, union: int):
+        if len(chosen) == size:
+            yield tuple(chosen), union
+            return
+
+        for pos in range(start, len(candidates) - (size - len(chosen)) + 1):
+            index = candidates[pos]
+            new_union = union | masks[index]
+
+            if popcount(new_union) > size:
+                continue
+
+            chosen.append(index)
+            yield from search(pos + 1, new_union)
+            chosen.pop()
+
+    return search(0, 0)
+
+
 # This rule is an extension of the only 1 possible location for a cell rule.
 # If two values can only be located in two spots, then we know those cells must exclusively
 # contain those two values.  We can use this knowledge to eliminate other possible values within
 # these cells.  This principle can be expanded to larger sets of cells.
-def _combination_exclusive_rule_helper(cells: Set[Cell]) -> List[Action]:
+#
+# This looks for both forms of the rule, for subsets of 2 up to subset_max_size cells:
+# Naked subsets, where k cells only have k possible values between them, so no other cell can have those values.
+# Hidden subsets, where k values only have k possible cells between them, so those cells can't have other values.
+#
+# found holds the (x, y, value) eliminations already made, so a rule can share it between units to avoid duplicates.
+def _combination_exclusive_rule_helper(cells: List[Cell], found: Set[Tuple[int, int, int]]) -> List[Action]:
 
     action_arr = []
 
-    remove_cells = set()
+    cell_masks = [cell.possible_mask() for cell in cells]
+    max_size = min(subset_max_size, len(cells) - 1)
 
-    for cell_com in itertools.combinations(cells, 2):
-        union_poss = set()
+    # For each value, a mask of the positions in cells where it is possible.
+    value_positions = {}
+    for position, cell_mask in enumerate(cell_masks):
+        for val in mask_to_vals(cell_mask):
+            value_positions[val] = value_positions.get(val, 0) | (1 << position)
 
-        for cell in cell_com:
-            union_poss = union_poss.union(cell.possible_vals())
+    values = sorted(value_positions)
+    position_masks = [value_positions[val] for val in values]
 
-        if len(union_poss) == len(cell_com):
-            remove_cells = remove_cells.union(cell_com)
-            other_cells = cells.difference(cell_com)
+    def clear(position: int, clear_mask: int):
+        cell = cells[position]
+        for val in mask_to_vals(cell_masks[position] & clear_mask):
+            key = (cell.x(), cell.y(), val)
+            if key not in found:
+                found.add(key)
+                action_arr.append(ClearPossibleAction(cell.x(), cell.y(), val))
 
-            for mod_cell in other_cells:
-                mod_poss = mod_cell.possible_vals()
+    for size in range(2, max_size + 1):
 
-                for val in union_poss:
-                    if val in mod_poss:
-                        action_arr.append(ClearPossibleAction(mod_cell.x(), mod_cell.y(), val))
+        for subset, union_vals in _small_union_combinations(cell_masks, size):
+            if popcount(union_vals) != size:
+                continue
+
+            for position in range(len(cells)):
+                if position not in subset:
+                    clear(position, union_vals)
+
+        for subset, union_positions in _small_union_combinations(position_masks, size):
+            if popcount(union_positions) != size:
+                continue
+
+            subset_vals = 0
+            for index in subset:
+                subset_vals |= 1 << (values[index] - 1)
+
+            for position in mask_to_vals(union_positions):
+                clear(position - 1, ~subset_vals)
 
     return action_arr
 
 
-def combination_exclusive_rowcol_rule(board: Board) -> List[Action]:
+def combination_exclusive_rowcol_rule(board: Board, dirty_cells: Set[Coord] = None) -> List[Action]:
 
     action_arr = []
+    found = set()
 
-    for x in range(board.max_val()):
+    for x in _rows_to_check(board, dirty_cells):
         cur_row = board.row_cells(x, True)
 
-        action_arr.extend(_combination_exclusive_rule_helper(cur_row))
+        action_arr.extend(_combination_exclusive_rule_helper(cur_row, found))
 
-    for y in range(board.max_val()):
+    for y in _cols_to_check(board, dirty_cells):
         cur_col = board.col_cells(y, True)
 
-        action_arr.extend(_combination_exclusive_rule_helper(cur_col))
+        action_arr.extend(_combination_exclusive_rule_helper(cur_col, found))
 
     return action_arr
 
 
-def combination_exclusive_quadrant_rule(board: Board) -> List[Action]:
+def combination_exclusive_quadrant_rule(board: Board, dirty_cells: Set[Coord] = None) -> List[Action]:
 
     action_arr = []
+    found = set()
 
-    max_val =  board.max_val()
-    max_sqrt = board.max_sqrt()
+    for quadrant_x, quadrant_y in _quadrants_to_check(board, dirty_cells):
+        quadrant_cells = board.quadrant_cells(quadrant_x, quadrant_y, True)
 
-    for quadrant_x in range(0, max_val, max_sqrt):
-        for quadrant_y in range(0, max_val, max_sqrt):
-            quadrant_cells = board.quadrant_cells(quadrant_x, quadrant_y, True)
+        action_arr.extend(_combination_exclusive_rule_helper(quadrant_cells, found))
+
+    return action_arr
+
+
+# The largest fish that rule_fish looks for: 2 is an X-Wing, 3 a Swordfish and 4 a Jellyfish.
+# None looks for fish up to the quadrant size of the board, and larger sizes are capped to it.
+fish_max_size: Optional[int] = None
+
+
+# Finds the fish for a single value.  base_masks[i] is a mask of the cover lines where the value is possible in
+# base line i, and cover_masks is the same thing transposed.  If size base lines only have the value possible in
+# size cover lines between them, the value must be in those cover lines at the base lines, so the rest of the
+# cover lines can't have it.  to_coord turns a (base line, cover line) pair into the coordinates of the cell.
+def _fish_helper(val: int, base_masks: List[int], cover_masks: List[int], max_size: int,
+                 to_coord: Callable[[int, int], Coord], found: Set[Tuple[int, int, int]]) -> List[Action]:
+
+    action_arr = []
+
+    for size in range(2, max_size + 1):
+
+        for subset, union_covers in _small_union_combinations(base_masks, size):
+            if popcount(union_covers) != size:
+                continue
+
+            subset_bases = 0
+            for index in subset:
+                subset_bases |= 1 << index
+
+            for cover in mask_to_vals(union_covers):
+                for base in mask_to_vals(cover_masks[cover - 1] & ~subset_bases):
+                    x, y = to_coord(base - 1, cover - 1)
+                    key = (x, y, val)
+                    if key not in found:
+                        found.add(key)
+                        action_arr.append(ClearPossibleAction(x, y, val))
+
+    return action_arr
+
+
+# Fish are the row and column version of the hidden subsets above, looked at one value at a time.
+# If a value is only possible in the same 2 columns of 2 different rows (an X-Wing), it has to go in one
+# of the corners of that rectangle, so every other cell of those 2 columns can't have the value.  The same goes for
+# 3 rows and 3 columns (a Swordfish), 4 (a Jellyfish), and so on, and for columns and rows the other way around.
+#
+# One pass over the board builds, for each value, a mask of the columns it can go in for every row and of the
+# rows it can go in for every column.  The rule always examines the whole board.
+def rule_fish(board: Board, dirty_cells: Set[Coord] = None) -> List[Action]:
+
+    action_arr = []
+
+    max_val = board.max_val()
+    max_size = board.max_sqrt()
+    if fish_max_size is not None:
+        max_size = min(max_size, fish_max_size)
+
+    if max_size < 2:
+        return action_arr
+
+    row_masks = [[0] * max_val for _ in range(max_val)]
+    col_masks = [[0] * max_val for _ in range(max_val)]
+
+    for cell in board.all_cells(True):
+        x, y = cell.x(), cell.y()
+        for val in mask_to_vals(cell.possible_mask()):
+            row_masks[val - 1][x] |= 1 << y
+            col_masks[val - 1][y] |= 1 << x
+
+    found: Set[Tuple[int, int, int]] = set()
 
-            action_arr.extend(_combination_exclusive_rule_helper(quadrant_cells))
+    for val in range(1, max_val + 1):
+        action_arr.extend(_fish_helper(val, row_masks[val - 1], col_masks[val - 1], max_size,
+                                       lambda base, cover: (base, cover), found))
+        action_arr.extend(_fish_helper(val, col_masks[val - 1], row_masks[val - 1], max_size,
+                                       lambda base, cover: (cover, base), found))
 
     return action_arr
 
@@ -235,7 +493,8 @@ rule_set = [
     rule_row_exclusive,
     rule_col_exclusive,
     rule_quadrant_exclusive,
-    #rule_quadrant_col_and_row_elim_possible,
-    #combination_exclusive_rowcol_rule,
-    #combination_exclusive_quadrant_rule
+    rule_quadrant_col_and_row_elim_possible,
+    combination_exclusive_rowcol_rule,
+    combination_exclusive_quadrant_rule,
+    rule_fish,
 ]
\ No newline at end of file
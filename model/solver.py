@@ -1,9 +1,22 @@
 #from model.action import SetAction
 from model.rules import *
-from typing import Optional
+from model.dlx import DancingLinks
+from model.tensor import TensorBoard, tensor_from_board, tensor_rules
+from typing import Callable, Iterator, Optional
 import random
 import time
 
+# Search engines that Solver.solve can use.  Both produce the same list of (rule, actions) steps.
+ENGINE_RECURSIVE = "recursive"  # _solve_helper, which copies the board for every step and guess.
+ENGINE_TRAIL = "trail"  # _solve_in_place, which searches on one board and undoes guesses with a trail.
+
+# Exact cover search, see solve_exact_cover.  This skips the rules, so its only step is the full solution.
+ENGINE_DLX = "dlx"
+
+# Trail style search on a TensorBoard, see _tensor_search.  Needs numpy, and produces the same steps as the others.
+ENGINE_TENSOR = "tensor"
+
+
 class Solver:
 
     __solve_single_step: bool
@@ -52,9 +65,19 @@ class Solver:
             self.__board_steps.append((new_board, rule, cur_actions))
             self.__cur_board = new_board
 
-    def solve(self):
-
-        solve_steps = _solve_helper(self.__cur_board, False)
+    def solve(self, engine: str = ENGINE_RECURSIVE):
+
+        if engine == ENGINE_RECURSIVE:
+            solve_steps = _solve_helper(self.__cur_board, False)
+        elif engine == ENGINE_TRAIL:
+            solve_steps, solved_board = _solve_in_place(self.__cur_board)
+        elif engine == ENGINE_TENSOR:
+            solve_steps, solved_board = _solve_tensor(self.__cur_board)
+        elif engine == ENGINE_DLX:
+            solution = solve_exact_cover(self.__cur_board)
+            solve_steps = [("exact_cover", solution)] if solution is not None else []
+        else:
+            raise ValueError("Unknown solver engine: %s" % engine)
 
         for rule, actions in solve_steps:
             self.__apply_actions(rule, actions)
@@ -66,14 +89,23 @@ class Solver:
             print(rule, action_list)
 
 
-def _get_next_steps(board: Board) -> Tuple[str, List[Action]]:
+# Runs the rules in order, returning the actions of the first one that finds any.
+# When a tracker is given, rules only re-examine the parts of the board that changed since they last found nothing,
+# so the caller must mark every change it makes to the board on the tracker.
+def _get_next_steps(board: Board, tracker: DirtyTracker = None) -> Tuple[str, List[Action]]:
 
     for rule in rule_set:
-        rule_actions = rule(board)
+        if tracker is None:
+            rule_actions = rule(board)
+        else:
+            rule_actions = rule(board, tracker.dirty_cells(rule))
 
         if len(rule_actions) > 0:
             return rule.__name__, rule_actions
 
+        if tracker is not None:
+            tracker.mark_clean(rule)
+
     return "", []
 
 
@@ -88,7 +120,7 @@ def _random_initial_val(board: Board) -> InitialSetAction:
         cell = board.get_cell(x, y)
 
         if cell.value() is None:
-            poss_vals = list(cell.possible_vals())
+            poss_vals = list(mask_to_vals(cell.possible_mask()))
 
             if len(poss_vals) == 1:
                 index = 0
@@ -100,15 +132,18 @@ def _random_initial_val(board: Board) -> InitialSetAction:
 
 _itercount = 0
 
-def _solve_helper(board: Board, check_unique: bool) -> List[Tuple[str, List[Action]]]:
+def _solve_helper(board: Board, check_unique: bool, tracker: DirtyTracker = None) -> List[Tuple[str, List[Action]]]:
 
     rule_action_list : List[Tuple[str, List[Action]]] = []
 
+    if tracker is None:
+        tracker = DirtyTracker()
+
     start_time = time.time()
     global _itercount
 
     while not board.is_solved():
-        rule, next_actions = _get_next_steps(board)
+        rule, next_actions = _get_next_steps(board, tracker)
 
         if len(next_actions) == 0:
 
@@ -117,7 +152,7 @@ def _solve_helper(board: Board, check_unique: bool) -> List[Tuple[str, List[Acti
             else:
                 min_cell = board.min_poss_cell()
 
-                poss_vals = min_cell.possible_vals()
+                poss_vals = mask_to_vals(min_cell.possible_mask())
 
                 rule = "solver_try_value"
                 actions_found = False
@@ -135,7 +170,10 @@ def _solve_helper(board: Board, check_unique: bool) -> List[Tuple[str, List[Acti
 
                     next_board = board.apply_actions(next_action)
 
-                    future_steps = _solve_helper(next_board, check_unique)
+                    next_tracker = tracker.copy()
+                    next_tracker.mark(next_board.changed_cells())
+
+                    future_steps = _solve_helper(next_board, check_unique, next_tracker)
 
                     future_actions = []
                     for r, act in future_steps:
@@ -161,12 +199,332 @@ def _solve_helper(board: Board, check_unique: bool) -> List[Tuple[str, List[Acti
 
         else:
             board = board.apply_actions(next_actions)
+            tracker.mark(board.changed_cells())
 
             rule_action_list.append( (rule, next_actions) )
 
     return rule_action_list
 
 
+# Depth first search on a single mutable copy of the board.  Instead of recursing with a new board per guess,
+# the search keeps an explicit stack of guesses, and each guess remembers the board's trail mark and the trace
+# length at the time it was made, so trying the next value is an undo rather than a rebuild.
+#
+# Yields the mutable board every time it is solved, with trace (if given) holding the steps that led there.
+# The board and trace are modified once the search resumes, so callers must copy anything they keep.
+def _trail_search(board: Board, trace: Optional[List[Tuple[str, List[Action]]]]) -> Iterator[Board]:
+
+    work_board = board.mutable_copy()
+    tracker = DirtyTracker()
+    guess_stack = []  # List of [trail mark, trace length, x, y, untried value mask]
+
+    while True:
+
+        while not work_board.is_solved():
+            rule, next_actions = _get_next_steps(work_board, tracker)
+
+            if len(next_actions) == 0:
+                break
+
+            step_mark = work_board.trail_mark()
+            work_board.apply_actions_in_place(next_actions)
+            tracker.mark(work_board.trail_cells(step_mark))
+
+            if trace is not None:
+                trace.append((rule, next_actions))
+
+        if work_board.is_solved():
+            yield work_board
+        elif not work_board.is_invalid():
+            min_cell = work_board.min_poss_cell()
+            guess_stack.append([work_board.trail_mark(), len(trace) if trace is not None else 0,
+                                min_cell.x(), min_cell.y(), min_cell.possible_mask()])
+
+        # Backtrack to the most recent guess that still has values left to try.
+        while len(guess_stack) > 0:
+            guess = guess_stack[-1]
+            mark, trace_len, x, y, untried = guess
+
+            tracker.mark(work_board.trail_cells(mark))
+            work_board.undo_to(mark)
+            if trace is not None:
+                del trace[trace_len:]
+
+            if untried == 0:
+                guess_stack.pop()
+                continue
+
+            low_bit = untried & -untried
+            guess[4] = untried ^ low_bit
+
+            next_action = [SetAction(x, y, low_bit.bit_length())]
+            work_board.apply_actions_in_place(next_action)
+            tracker.mark(work_board.trail_cells(mark))
+
+            if trace is not None:
+                trace.append(("solver_try_value", next_action))
+            break
+        else:
+            return
+
+
+# Trail based replacement for _solve_helper(board, False).  Returns the same steps,
+# along with the board they lead to.
+def _solve_in_place(board: Board) -> Tuple[List[Tuple[str, List[Action]]], Board]:
+
+    rule_action_list: List[Tuple[str, List[Action]]] = []
+    search = _trail_search(board, rule_action_list)
+
+    for solved_board in search:
+        return rule_action_list, solved_board.locked_copy()
+
+    # No solution, the steps are the ones taken before the first guess.
+    return rule_action_list, board.apply_actions([act for rule, actions in rule_action_list for act in actions])
+
+
+# The tensor version of _get_next_steps.  Rules with a vectorized version in tensor_rules run on the TensorBoard,
+# and the rest run on the matching Board from scalar_board, which is only called once one of them is reached.
+def _get_next_tensor_steps(board: TensorBoard, scalar_board: Callable[[], Board],
+                           tracker: DirtyTracker) -> Tuple[str, List[Action]]:
+
+    for rule in rule_set:
+        tensor_rule = tensor_rules.get(rule)
+
+        if tensor_rule is not None:
+            rule_actions = tensor_rule(board)
+        else:
+            rule_actions = rule(scalar_board(), tracker.dirty_cells(rule))
+
+        if len(rule_actions) > 0:
+            return rule.__name__, rule_actions
+
+        tracker.mark_clean(rule)
+
+    return "", []
+
+
+# The same search as _trail_search, on a TensorBoard instead of a mutable Board.  The singles rules are vectorized
+# reductions over the whole board, which pays off on the larger boards where they run most often.
+# Each guess keeps a copy of the TensorBoard to go back to, since copying the arrays is cheaper than undoing,
+# and the changed cells for the tracker come from comparing the board before and after every change.
+#
+# The rules without a vectorized version need a Board.  The search keeps a Board that lags behind, along with the
+# actions taken since, and only applies them when one of those rules runs.
+def _tensor_search(board: Board, trace: Optional[List[Tuple[str, List[Action]]]]) -> Iterator[TensorBoard]:
+
+    work_board = tensor_from_board(board)
+    tracker = DirtyTracker()
+    guess_stack = []  # List of [board copy, lagging board, pending actions, trace length, x, y, untried value mask]
+
+    lagging_board = board
+    pending_actions: List[Action] = []
+
+    def scalar_board() -> Board:
+        nonlocal lagging_board, pending_actions
+
+        if len(pending_actions) > 0:
+            lagging_board = lagging_board.apply_actions(pending_actions)
+            pending_actions = []
+
+        return lagging_board
+
+    while True:
+
+        while not work_board.is_solved():
+            rule, next_actions = _get_next_tensor_steps(work_board, scalar_board, tracker)
+
+            if len(next_actions) == 0:
+                break
+
+            prev_board = work_board.copy()
+            work_board.apply_actions(next_actions)
+            tracker.mark(work_board.changed_cells(prev_board))
+            pending_actions.extend(next_actions)
+
+            if trace is not None:
+                trace.append((rule, next_actions))
+
+        if work_board.is_solved():
+            yield work_board
+        elif not work_board.is_invalid():
+            x, y = work_board.min_poss_cell()
+            guess_stack.append([work_board.copy(), lagging_board, pending_actions[:],
+                                len(trace) if trace is not None else 0, x, y, work_board.possible_mask(x, y)])
+
+        # Backtrack to the most recent guess that still has values left to try.
+        while len(guess_stack) > 0:
+            guess = guess_stack[-1]
+            guess_board, guess_lagging_board, guess_pending_actions, trace_len, x, y, untried = guess
+
+            if trace is not None:
+                del trace[trace_len:]
+
+            if untried == 0:
+                guess_stack.pop()
+                continue
+
+            low_bit = untried & -untried
+            guess[6] = untried ^ low_bit
+
+            next_action = [SetAction(x, y, low_bit.bit_length())]
+            prev_board = work_board
+            work_board = guess_board.copy()
+            work_board.apply_actions(next_action)
+            tracker.mark(work_board.changed_cells(prev_board))
+
+            lagging_board = guess_lagging_board
+            pending_actions = guess_pending_actions + next_action
+
+            if trace is not None:
+                trace.append(("solver_try_value", next_action))
+            break
+        else:
+            return
+
+
+# _solve_in_place for the tensor engine.
+def _solve_tensor(board: Board) -> Tuple[List[Tuple[str, List[Action]]], Board]:
+
+    rule_action_list: List[Tuple[str, List[Action]]] = []
+
+    for solved_board in _tensor_search(board, rule_action_list):
+        return rule_action_list, solved_board.to_board()
+
+    return rule_action_list, board.apply_actions([act for rule, actions in rule_action_list for act in actions])
+
+
+# Solves the board with the given engine without recording any history, and returns the last board reached.
+# The returned board is only solved if the puzzle had a solution.
+def solve_board(board: Board, engine: str = ENGINE_TRAIL) -> Board:
+
+    if engine == ENGINE_RECURSIVE:
+        solve_steps = _solve_helper(board, False)
+        return board.apply_actions([act for rule, actions in solve_steps for act in actions])
+    elif engine == ENGINE_TRAIL:
+        solve_steps, solved_board = _solve_in_place(board)
+        return solved_board
+    elif engine == ENGINE_TENSOR:
+        solve_steps, solved_board = _solve_tensor(board)
+        return solved_board
+    elif engine == ENGINE_DLX:
+        solution = solve_exact_cover(board)
+        return board.apply_actions(solution) if solution is not None else board
+    else:
+        raise ValueError("Unknown solver engine: %s" % engine)
+
+
+# Counts the solutions of the board, stopping as soon as limit solutions have been found.
+# Returns the count, and the first solution found if keep_first is set (None otherwise).
+# This is the uniqueness check used by generate: with the default limit of 2, a count of 1 means the puzzle is unique.
+def count_solutions(board: Board, limit: int = 2, keep_first: bool = False,
+                    engine: str = ENGINE_DLX) -> Tuple[int, Optional[Board]]:
+
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    count = 0
+    first_solution = None
+
+    if engine == ENGINE_TRAIL:
+        # No trace is kept, so the search doesn't build up any step lists.
+        for solved_board in _trail_search(board, None):
+            if keep_first and count == 0:
+                first_solution = solved_board.locked_copy()
+
+            count += 1
+            if count >= limit:
+                break
+    elif engine == ENGINE_TENSOR:
+        for solved_board in _tensor_search(board, None):
+            if keep_first and count == 0:
+                first_solution = solved_board.to_board()
+
+            count += 1
+            if count >= limit:
+                break
+    elif engine == ENGINE_DLX:
+        for row_ids in _exact_cover_matrix(board).search(limit):
+            if keep_first and count == 0:
+                first_solution = board.apply_actions(_exact_cover_actions(board, row_ids))
+
+            count += 1
+    else:
+        raise ValueError("Unknown solver engine: %s" % engine)
+
+    return count, first_solution
+
+
+# Builds the exact cover matrix for the board.  Every row is a candidate (x, y, value), with the row id
+# x * max_val * max_val + y * max_val + value - 1, and the columns are the constraints: each cell holds one value,
+# and each row, column and quadrant holds each value once.  Constraints already met by filled cells are left out,
+# as are candidates that would break them.
+def _exact_cover_matrix(board: Board) -> DancingLinks:
+
+    max_val = board.max_val()
+    tables = board.unit_tables()
+    area = max_val * max_val
+
+    # Constraint numbering: cell, row/value, column/value, quadrant/value.
+    def constraints(x: int, y: int, value: int) -> Tuple[int, int, int, int]:
+        quadrant = tables.quadrant_index(x, y)
+        return (x * max_val + y,
+                area + x * max_val + value - 1,
+                2 * area + y * max_val + value - 1,
+                3 * area + quadrant * max_val + value - 1)
+
+    satisfied = set()
+    for cell in board.all_cells():
+        if cell.value() is not None:
+            satisfied.update(constraints(cell.x(), cell.y(), cell.value()))
+
+    column_index = {}
+    for constraint in range(4 * area):
+        if constraint not in satisfied:
+            column_index[constraint] = len(column_index)
+
+    matrix = DancingLinks(len(column_index))
+
+    for cell in board.all_cells(True):
+        x = cell.x()
+        y = cell.y()
+
+        for value in mask_to_vals(cell.possible_mask()):
+            row_constraints = constraints(x, y, value)
+
+            if satisfied.isdisjoint(row_constraints):
+                matrix.add_row(x * area + y * max_val + value - 1,
+                               [column_index[constraint] for constraint in row_constraints])
+
+    return matrix
+
+
+def _exact_cover_actions(board: Board, row_ids: List[int]) -> List[Action]:
+    max_val = board.max_val()
+    area = max_val * max_val
+
+    return [SetAction(row_id // area, (row_id % area) // max_val, row_id % max_val + 1) for row_id in sorted(row_ids)]
+
+
+# Solves the board as an exact cover problem, without using the rules.
+# Returns the SetActions that fill in the empty cells, or None if the board has no solution.
+def solve_exact_cover(board: Board) -> Optional[List[Action]]:
+
+    for row_ids in _exact_cover_matrix(board).search(1):
+        return _exact_cover_actions(board, row_ids)
+
+    return None
+
+
+# Counts the solutions of the board, stopping once limit solutions have been found.
+def count_exact_cover_solutions(board: Board, limit: int = 2) -> int:
+
+    count = 0
+    for row_ids in _exact_cover_matrix(board).search(limit):
+        count += 1
+
+    return count
+
+
 def generate(max_val: int) -> Optional[List[Action]]:
 
     # Online research suggests that the minimum number of filled spaces for a 9x9 sudoku board is 17.
@@ -214,22 +572,13 @@ def generate(max_val: int) -> Optional[List[Action]]:
             else:
                 break
 
-        try:
-            result_rules = _solve_helper(genboard, True)
-            check_board = genboard
+        solution_count, solution = count_solutions(genboard, 2)
 
-            for rule, rule_actions in result_rules:
-                check_board = check_board.apply_actions(rule_actions)
-
-            if check_board.is_solved():
-                return initial_actions
-
-            if check_board.is_invalid():
-                return None
+        if solution_count == 1:
+            return initial_actions
 
-        except ValueError:
-            # This means that the puzzle does not have a unique solution
-            pass
+        if solution_count == 0:
+            return None
 
         set_action = _random_initial_val(genboard)
         initial_actions.append(set_action)
@@ -0,0 +1,224 @@
+
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+
+from model.action import Action, ClearPossibleAction, InitialSetAction, SetAction
+from model.board import Board
+from model.cell import Cell
+from model.rules import Rule, rule_one_possible, rule_row_exclusive, rule_col_exclusive, rule_quadrant_exclusive
+
+# NumPy is optional, and only needed once a TensorBoard is created.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The tensor engine requires numpy, which is not installed.")
+
+
+# The TensorBoard class holds a board as NumPy arrays, so that rules can look at every cell at once with
+# reductions along the array axes, instead of looping over Cell objects.
+#
+# The candidates are an n x n x n boolean tensor indexed by (row, column, value - 1), which is False everywhere for
+# filled cells, just like Cell.possible_mask().  The values are an n x n array holding 0 for empty cells.
+# Unlike Board, a TensorBoard is modified in place by apply_actions, and copy() is cheap.
+class TensorBoard:
+
+    __max_val: int
+    __max_sqrt: int
+    __values: np.ndarray
+    __candidates: np.ndarray
+    __initial: np.ndarray
+
+    def __init__(self, max_val: int, max_sqrt: int, values: np.ndarray, candidates: np.ndarray, initial: np.ndarray):
+        _require_numpy()
+
+        self.__max_val = max_val
+        self.__max_sqrt = max_sqrt
+        self.__values = values
+        self.__candidates = candidates
+        self.__initial = initial
+
+    def max_val(self) -> int:
+        return self.__max_val
+
+    def max_sqrt(self) -> int:
+        return self.__max_sqrt
+
+    def values(self) -> np.ndarray:
+        return self.__values
+
+    def candidates(self) -> np.ndarray:
+        return self.__candidates
+
+    def initial(self) -> np.ndarray:
+        return self.__initial
+
+    def copy(self) -> TensorBoard:
+        return TensorBoard(self.__max_val, self.__max_sqrt, self.__values.copy(), self.__candidates.copy(),
+                           self.__initial.copy())
+
+    # The candidates split into quadrants, indexed by (quadrant row, row in quadrant, quadrant col, col in quadrant,
+    # value - 1).  This is a view, so it sees (and makes) changes to the candidates.
+    def quadrant_view(self) -> np.ndarray:
+        max_val = self.__max_val
+        max_sqrt = self.__max_sqrt
+
+        return self.__candidates.reshape(max_val // max_sqrt, max_sqrt, max_val // max_sqrt, max_sqrt, max_val)
+
+    def is_solved(self) -> bool:
+        return bool((self.__values != 0).all())
+
+    def is_invalid(self) -> bool:
+        return bool(((self.__values == 0) & ~self.__candidates.any(axis=2)).any())
+
+    # The same cell Board.min_poss_cell picks: the first empty cell, in row order, with the fewest possible values.
+    # Returns None if every cell is filled.
+    def min_poss_cell(self) -> Optional[Tuple[int, int]]:
+        empty = self.__values == 0
+        if not empty.any():
+            return None
+
+        counts = np.where(empty, self.__candidates.sum(axis=2), self.__max_val + 1)
+        x, y = divmod(int(counts.argmin()), self.__max_val)
+
+        return x, y
+
+    # The coordinates of the cells whose value or possible values differ between this board and the other one.
+    def changed_cells(self, other: TensorBoard) -> List[Tuple[int, int]]:
+        changed = (self.__values != other.values()) | (self.__candidates != other.candidates()).any(axis=2)
+        xs, ys = np.nonzero(changed)
+
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def possible_mask(self, x: int, y: int) -> int:
+        mask = 0
+        for val in np.flatnonzero(self.__candidates[x, y]).tolist():
+            mask |= 1 << val
+
+        return mask
+
+    # Applies the actions in order, with the same results as Board.apply_actions.
+    # Only the set and clear possible actions that the rules and solvers produce are supported.
+    def apply_actions(self, actions: List[Action]):
+        values = self.__values
+        candidates = self.__candidates
+        max_sqrt = self.__max_sqrt
+
+        for act in actions:
+            x, y, val = act.x(), act.y(), act.value()
+
+            if self.__initial[x, y]:
+                continue
+
+            if isinstance(act, SetAction):
+                # Like Cell.set_value, an empty cell only takes the value if it is still possible,
+                # but the value is cleared from its peers either way.
+                if values[x, y] != 0 or candidates[x, y, val - 1]:
+                    values[x, y] = val
+                    candidates[x, y] = False
+                    self.__initial[x, y] = isinstance(act, InitialSetAction)
+
+                quadrant_x = x - x % max_sqrt
+                quadrant_y = y - y % max_sqrt
+                candidates[x, :, val - 1] = False
+                candidates[:, y, val - 1] = False
+                candidates[quadrant_x:quadrant_x + max_sqrt, quadrant_y:quadrant_y + max_sqrt, val - 1] = False
+            elif isinstance(act, ClearPossibleAction):
+                candidates[x, y, val - 1] = False
+            else:
+                raise ValueError("Unsupported action for a TensorBoard: %r" % act)
+
+    def to_board(self) -> Board:
+        max_val = self.__max_val
+        masks = self.__candidates.astype(np.int64) @ (np.int64(1) << np.arange(max_val, dtype=np.int64))
+
+        board = Board(max_val).mutable_copy()
+        for x, (row_values, row_masks, row_initial) in enumerate(zip(self.__values.tolist(), masks.tolist(),
+                                                                      self.__initial.tolist())):
+            for y in range(max_val):
+                if row_values[y] != 0:
+                    board.set_cell(Cell(max_val, x, y, cur_val=row_values[y], is_initial=row_initial[y]))
+                else:
+                    board.set_cell(Cell(max_val, x, y, poss_mask=row_masks[y]))
+
+        return board.locked_copy()
+
+
+def tensor_from_board(board: Board) -> TensorBoard:
+    _require_numpy()
+
+    max_val = board.max_val()
+    cells = board.all_cells()
+
+    values = np.array([cell.value() or 0 for cell in cells], dtype=np.int64).reshape(max_val, max_val)
+    initial = np.array([cell.is_initial() for cell in cells], dtype=bool).reshape(max_val, max_val)
+
+    masks = np.array([cell.possible_mask() for cell in cells], dtype=np.int64).reshape(max_val, max_val, 1)
+    candidates = ((masks >> np.arange(max_val, dtype=np.int64)) & 1).astype(bool)
+
+    return TensorBoard(max_val, board.max_sqrt(), values, candidates, initial)
+
+
+# Each of these is a vectorized version of the rule in model.rules with the same name (without the tensor_ prefix),
+# and returns the same actions in the same order as that rule does when it examines the whole board.
+
+def _single_value_actions(hits: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> List[Action]:
+    vals = hits[xs, ys].argmax(axis=1) + 1
+
+    return [SetAction(x, y, val) for x, y, val in zip(xs.tolist(), ys.tolist(), vals.tolist())]
+
+
+def tensor_rule_one_possible(board: TensorBoard) -> List[Action]:
+    candidates = board.candidates()
+
+    xs, ys = np.nonzero(candidates.sum(axis=2) == 1)
+
+    return _single_value_actions(candidates, xs, ys)
+
+
+# The hidden single rules keep the values possible in exactly one cell of a unit, and set the cells
+# that are left with exactly one of those values, see _rule_exclusive_set.
+def tensor_rule_row_exclusive(board: TensorBoard) -> List[Action]:
+    candidates = board.candidates()
+
+    hits = candidates & (candidates.sum(axis=1) == 1)[:, np.newaxis, :]
+    xs, ys = np.nonzero(hits.sum(axis=2) == 1)
+
+    return _single_value_actions(hits, xs, ys)
+
+
+def tensor_rule_col_exclusive(board: TensorBoard) -> List[Action]:
+    candidates = board.candidates()
+
+    hits = candidates & (candidates.sum(axis=0) == 1)[np.newaxis, :, :]
+    ys, xs = np.nonzero((hits.sum(axis=2) == 1).T)
+
+    return _single_value_actions(hits, xs, ys)
+
+
+def tensor_rule_quadrant_exclusive(board: TensorBoard) -> List[Action]:
+    quadrants = board.quadrant_view()
+    max_sqrt = board.max_sqrt()
+
+    hits = quadrants & (quadrants.sum(axis=(1, 3)) == 1)[:, np.newaxis, :, np.newaxis, :]
+
+    # Quadrants in row order, then the cells of each quadrant in row order.
+    quadrant_xs, quadrant_ys, inner_xs, inner_ys = np.nonzero((hits.sum(axis=4) == 1).transpose(0, 2, 1, 3))
+
+    xs = quadrant_xs * max_sqrt + inner_xs
+    ys = quadrant_ys * max_sqrt + inner_ys
+
+    return _single_value_actions(hits.reshape(board.candidates().shape), xs, ys)
+
+
+# The rules of model.rules that have a vectorized version.
+tensor_rules: Dict[Rule, Callable[[TensorBoard], List[Action]]] = {
+    rule_one_possible: tensor_rule_one_possible,
+    rule_row_exclusive: tensor_rule_row_exclusive,
+    rule_col_exclusive: tensor_rule_col_exclusive,
+    rule_quadrant_exclusive: tensor_rule_quadrant_exclusive,
+}
@@ -0,0 +1,129 @@
+
+from __future__ import annotations
+from typing import Dict, Tuple
+import math
+
+Coord = Tuple[int, int]
+
+
+# The UnitTables class holds the precomputed layout of a board of a given size:
+# the coordinates of every row, column and quadrant, and the peers of every cell.
+# Tables are immutable and shared between every board of the same max_val, see unit_tables().
+#
+# Cells are also addressed by a flat index (x * max_val + y), which is used to key the per cell tables.
+# Units are numbered rows first, then columns, then quadrants (in row-major quadrant order).
+class UnitTables:
+
+    __max_val: int
+    __max_sqrt: int
+    __coords: Tuple[Coord, ...]
+    __rows: Tuple[Tuple[Coord, ...], ...]
+    __cols: Tuple[Tuple[Coord, ...], ...]
+    __quadrants: Tuple[Tuple[Coord, ...], ...]
+    __units: Tuple[Tuple[Coord, ...], ...]
+    __linked: Tuple[Tuple[Coord, ...], ...]
+    __peers: Tuple[Tuple[Coord, ...], ...]
+    __cell_units: Tuple[Tuple[int, int, int], ...]
+
+    def __init__(self, max_val: int):
+        if max_val <= 1:
+            raise ValueError("max_val is <= 1!")
+        elif max_val != 2 and not math.sqrt(max_val).is_integer():
+            raise ValueError("max_val is not a square integer!")
+
+        max_sqrt = math.floor(math.sqrt(max_val))
+
+        self.__max_val = max_val
+        self.__max_sqrt = max_sqrt
+
+        self.__coords = tuple((x, y) for x in range(max_val) for y in range(max_val))
+
+        self.__rows = tuple(tuple((x, y) for y in range(max_val)) for x in range(max_val))
+        self.__cols = tuple(tuple((x, y) for x in range(max_val)) for y in range(max_val))
+
+        quadrants = []
+        for row_min in range(0, max_val, max_sqrt):
+            for col_min in range(0, max_val, max_sqrt):
+                quadrants.append(tuple((x, y)
+                                       for x in range(row_min, row_min + max_sqrt)
+                                       for y in range(col_min, col_min + max_sqrt)))
+        self.__quadrants = tuple(quadrants)
+
+        self.__units = self.__rows + self.__cols + self.__quadrants
+
+        cell_units = []
+        linked = []
+        peers = []
+        for x, y in self.__coords:
+            quadrant = self.quadrant_index(x, y)
+            cell_units.append((x, max_val + y, 2 * max_val + quadrant))
+
+            # Linked cells keep the row, column, quadrant ordering and only list each cell once.
+            cur_linked = list(self.__rows[x])
+            seen = set(cur_linked)
+            for coord in self.__cols[y] + self.__quadrants[quadrant]:
+                if coord not in seen:
+                    seen.add(coord)
+                    cur_linked.append(coord)
+
+            linked.append(tuple(cur_linked))
+            peers.append(tuple(coord for coord in cur_linked if coord != (x, y)))
+
+        self.__cell_units = tuple(cell_units)
+        self.__linked = tuple(linked)
+        self.__peers = tuple(peers)
+
+    def max_val(self) -> int:
+        return self.__max_val
+
+    def max_sqrt(self) -> int:
+        return self.__max_sqrt
+
+    def index(self, x: int, y: int) -> int:
+        return x * self.__max_val + y
+
+    def coords(self) -> Tuple[Coord, ...]:
+        return self.__coords
+
+    def rows(self) -> Tuple[Tuple[Coord, ...], ...]:
+        return self.__rows
+
+    def cols(self) -> Tuple[Tuple[Coord, ...], ...]:
+        return self.__cols
+
+    def quadrants(self) -> Tuple[Tuple[Coord, ...], ...]:
+        return self.__quadrants
+
+    def units(self) -> Tuple[Tuple[Coord, ...], ...]:
+        return self.__units
+
+    def quadrant_index(self, x: int, y: int) -> int:
+        return (x // self.__max_sqrt) * self.__max_sqrt + y // self.__max_sqrt
+
+    def quadrant(self, x: int, y: int) -> Tuple[Coord, ...]:
+        return self.__quadrants[self.quadrant_index(x, y)]
+
+    # The row, column and quadrant unit indexes that contain the given cell.
+    def cell_units(self, x: int, y: int) -> Tuple[int, int, int]:
+        return self.__cell_units[x * self.__max_val + y]
+
+    # All cells sharing a unit with the given cell, including the cell itself.
+    def linked(self, x: int, y: int) -> Tuple[Coord, ...]:
+        return self.__linked[x * self.__max_val + y]
+
+    # All cells sharing a unit with the given cell, excluding the cell itself.
+    def peers(self, x: int, y: int) -> Tuple[Coord, ...]:
+        return self.__peers[x * self.__max_val + y]
+
+
+_tables_cache: Dict[int, UnitTables] = {}
+
+
+def unit_tables(max_val: int) -> UnitTables:
+    tables = _tables_cache.get(max_val)
+
+    if tables is None:
+        tables = UnitTables(max_val)
+        _tables_cache[max_val] = tables
+
+    return tables
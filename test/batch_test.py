@@ -0,0 +1,67 @@
+import unittest
+from unittest import TestCase
+from model.batch import solve_many
+from model.lockstep import ENGINE_LOCKSTEP, np
+from model.board import create_board_from_string
+from model.solver import ENGINE_TRAIL, solve_board
+
+_PUZZLES = [
+    '004000000500003600632418000907024003041607290200930401000361527003700008000000100',
+    '000001340,485000000,001089000,000500709,200000001,709004000,000920800,000000567,036700000',
+    '123456780,000000009' + ',000000000' * 7,
+    'not a puzzle',
+    '0' * 16,
+]
+
+
+class SolveManyTest(TestCase):
+
+    def __check_results(self, results):
+        self.assertEqual(len(_PUZZLES), len(results))
+
+        for result in results:
+            self.assertEqual(_PUZZLES[result.index], result.puzzle)
+            self.assertGreaterEqual(result.elapsed, 0)
+
+        by_index = {result.index: result for result in results}
+
+        for index in [0, 1, 4]:
+            self.assertIsNone(by_index[index].error)
+            board, init_actions = create_board_from_string(by_index[index].solution)
+            self.assertTrue(board.is_solved())
+
+        self.assertEqual(str(solve_board(create_board_from_string(_PUZZLES[1])[0])), by_index[1].solution)
+
+        self.assertIsNone(by_index[2].solution)
+        self.assertEqual("no solution", by_index[2].error)
+
+        self.assertIsNone(by_index[3].solution)
+        self.assertIsNotNone(by_index[3].error)
+
+    def test_in_process(self):
+        results = list(solve_many(_PUZZLES, workers=1, chunksize=2))
+
+        self.assertEqual(list(range(len(_PUZZLES))), [result.index for result in results])
+        self.__check_results(results)
+
+    def test_pool_ordered(self):
+        results = list(solve_many(iter(_PUZZLES), workers=2, chunksize=1, engine=ENGINE_TRAIL))
+
+        self.assertEqual(list(range(len(_PUZZLES))), [result.index for result in results])
+        self.__check_results(results)
+
+    def test_pool_unordered(self):
+        results = list(solve_many(_PUZZLES, workers=2, chunksize=2, ordered=False))
+
+        self.__check_results(results)
+
+    @unittest.skipUnless(np is not None, "numpy is not installed")
+    def test_lockstep(self):
+        results = list(solve_many(_PUZZLES, workers=1, chunksize=2, engine=ENGINE_LOCKSTEP))
+
+        self.assertEqual(list(range(len(_PUZZLES))), [result.index for result in results])
+        self.__check_results(results)
+
+    def test_invalid_chunksize(self):
+        with self.assertRaises(ValueError):
+            list(solve_many(_PUZZLES, chunksize=0))
@@ -1,6 +1,7 @@
 
 from unittest import TestCase
-from model.board import Board
+from model.action import SetAction
+from model.board import Board, create_board_from_string
 
 
 class BoardTest(TestCase):
@@ -9,7 +10,29 @@ class BoardTest(TestCase):
         pass
 
     def test_immutable(self):
-        pass
+        board = Board(9)
+
+        with self.assertRaises(PermissionError):
+            board.set_cell(board.get_cell(0, 0).set_value(1))
+
+        new_board = board.apply_actions([SetAction(0, 0, 1), SetAction(4, 4, 5)])
+
+        # The original board must not see changes made to rows shared with the new board.
+        self.assertIsNone(board.get_cell(0, 0).value())
+        self.assertIsNone(board.get_cell(4, 4).value())
+        self.assertTrue(board.get_cell(0, 5).has_possible_val(1))
+        self.assertTrue(board.get_cell(8, 4).has_possible_val(5))
+
+        self.assertEqual(1, new_board.get_cell(0, 0).value())
+        self.assertEqual(5, new_board.get_cell(4, 4).value())
+        self.assertFalse(new_board.get_cell(0, 5).has_possible_val(1))
+        self.assertFalse(new_board.get_cell(8, 4).has_possible_val(5))
+
+        # Untouched cells are shared between the two boards.
+        self.assertIs(board.get_cell(6, 7), new_board.get_cell(6, 7))
+
+        with self.assertRaises(PermissionError):
+            new_board.set_cell(new_board.get_cell(1, 1).set_value(1))
 
     def test_get_row(self):
         pass
@@ -21,7 +44,16 @@ class BoardTest(TestCase):
         pass
 
     def test_get_linked(self):
-        pass
+        board = Board(9)
+
+        linked = board.linked_cells(4, 7)
+        peers = board.peer_cells(4, 7)
+
+        self.assertEqual(21, len(linked))
+        self.assertEqual(20, len(peers))
+        self.assertIn(board.get_cell(4, 7), linked)
+        self.assertNotIn(board.get_cell(4, 7), peers)
+        self.assertEqual(set(linked), set(peers) | {board.get_cell(4, 7)})
 
     def test_get_cell(self):
         pass
@@ -31,3 +63,27 @@ class BoardTest(TestCase):
 
     def test_is_invalid(self):
         pass
+
+    def test_undo_trail(self):
+        board, init_actions = create_board_from_string(
+            '004000000500003600632418000907024003041607290200930401000361527003700008000000100')
+        original = str(board)
+
+        work_board = board.mutable_copy()
+        mark = work_board.trail_mark()
+
+        work_board.apply_actions_in_place([SetAction(0, 0, 1)])
+        self.assertEqual(1, work_board.get_cell(0, 0).value())
+        self.assertFalse(work_board.get_cell(0, 1).has_possible_val(1))
+
+        snapshot = work_board.locked_copy()
+
+        work_board.undo_to(mark)
+        self.assertEqual(original, str(work_board))
+        self.assertEqual(original, str(board))
+        self.assertEqual(1, snapshot.get_cell(0, 0).value())
+
+        with self.assertRaises(PermissionError):
+            snapshot.set_cell(snapshot.get_cell(0, 1))
+        with self.assertRaises(PermissionError):
+            board.apply_actions_in_place([SetAction(0, 0, 1)])
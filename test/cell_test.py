@@ -1,7 +1,7 @@
 
 import unittest
 from unittest import TestCase
-from model.cell import Cell
+from model.cell import Cell, value_bit, full_mask, vals_to_mask, mask_to_vals, popcount
 
 
 class CellTest(TestCase):
@@ -265,3 +265,41 @@ class CellTest(TestCase):
 
 
 
+    def test_possible_mask(self):
+
+        c = Cell(9, 0, 0, poss_vals=frozenset({2, 3, 9}))
+        self.assertEqual(0b100000110, c.possible_mask())
+
+        c2 = Cell(9, 0, 0, poss_mask=0b100000110)
+        self.assertEqual({2, 3, 9}, c2.possible_vals())
+        self.assertEqual(3, c2.possible_count())
+
+        for x in self.__test_maxes:
+            c = Cell(x, 0, 0)
+            self.assertEqual((1 << x) - 1, c.possible_mask())
+
+        # Filled cells have no possible values.
+        c = Cell(9, 0, 0, 4)
+        self.assertEqual(0, c.possible_mask())
+
+        with self.assertRaises(ValueError):
+            Cell(9, 0, 0, poss_mask=1 << 9)
+        with self.assertRaises(ValueError):
+            Cell(9, 0, 0, poss_vals=frozenset({1}), poss_mask=1)
+        with self.assertRaises(ValueError):
+            Cell(9, 0, 0, cur_val=1, poss_mask=1)
+
+    def test_mask_helpers(self):
+
+        self.assertEqual(1, value_bit(1))
+        self.assertEqual(256, value_bit(9))
+        self.assertEqual(0b111111111, full_mask(9))
+
+        self.assertEqual(0b10101, vals_to_mask([1, 3, 5]))
+        self.assertEqual([1, 3, 5], list(mask_to_vals(0b10101)))
+        self.assertEqual([], list(mask_to_vals(0)))
+        self.assertEqual(list(range(1, 26)), list(mask_to_vals(full_mask(25))))
+
+        self.assertEqual(0, popcount(0))
+        self.assertEqual(3, popcount(0b10101))
+        self.assertEqual(25, popcount(full_mask(25)))
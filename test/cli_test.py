@@ -0,0 +1,46 @@
+import contextlib
+import io
+import os
+import tempfile
+from unittest import TestCase
+from model.cli import main
+
+
+class CliTest(TestCase):
+
+    def test_solve_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_path = os.path.join(tmp_dir, "puzzles.txt")
+            output_path = os.path.join(tmp_dir, "solutions.txt")
+
+            with open(input_path, "w") as input_file:
+                input_file.write("# comment\n")
+                input_file.write("004000000500003600632418000907024003041607290200930401000361527003700008000000100\n")
+                input_file.write("\n")
+                input_file.write("0000,0000,0000,0000\n")
+
+            self.assertEqual(0, main([input_path, "-o", output_path]))
+
+            with open(output_path) as output_file:
+                lines = output_file.read().splitlines()
+
+        self.assertEqual(["874596312,519273684,632418759,957124863,341687295,286935471,498361527,163752948,725849136,",
+                          "1234,3412,2143,4321,"], lines)
+
+    def test_failures(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_path = os.path.join(tmp_dir, "puzzles.txt")
+            output_path = os.path.join(tmp_dir, "solutions.txt")
+
+            with open(input_path, "w") as input_file:
+                input_file.write("123\n0000000000000000\n")
+
+            with contextlib.redirect_stderr(io.StringIO()) as errors:
+                self.assertEqual(1, main([input_path, "-o", output_path, "-e", "trail"]))
+
+            self.assertTrue(errors.getvalue().startswith("line 1: "))
+
+            with open(output_path) as output_file:
+                lines = output_file.read().splitlines()
+
+        self.assertEqual(["", "1234,3412,2143,4321,"], lines)
@@ -0,0 +1,41 @@
+from unittest import TestCase
+from model.dlx import DancingLinks
+
+
+class DancingLinksTest(TestCase):
+
+    def __knuth_matrix(self) -> DancingLinks:
+        # The example from Knuth's paper, which has the single cover {3, 0, 4}.
+        matrix = DancingLinks(7)
+        for row_id, columns in enumerate([[2, 4, 5], [0, 3, 6], [1, 2, 5], [0, 3], [1, 6], [3, 4, 6]]):
+            matrix.add_row(row_id, columns)
+        return matrix
+
+    def test_single_cover(self):
+        matrix = self.__knuth_matrix()
+
+        solutions = list(matrix.search())
+        self.assertEqual(1, len(solutions))
+        self.assertEqual({0, 3, 4}, set(solutions[0]))
+
+    def test_multiple_covers(self):
+        matrix = DancingLinks(2)
+        matrix.add_row(0, [0, 1])
+        matrix.add_row(1, [0])
+        matrix.add_row(2, [1])
+
+        self.assertEqual([{0}, {1, 2}], [set(rows) for rows in matrix.search()])
+        self.assertEqual(1, len(list(matrix.search(1))))
+
+        # Stopping early must leave the matrix intact for the next search.
+        self.assertEqual(2, len(list(matrix.search())))
+
+    def test_no_cover(self):
+        matrix = DancingLinks(3)
+        matrix.add_row(0, [0, 1])
+        matrix.add_row(1, [1, 2])
+
+        self.assertEqual([], list(matrix.search()))
+
+    def test_empty_matrix(self):
+        self.assertEqual([[]], list(DancingLinks(0).search()))
@@ -0,0 +1,56 @@
+import unittest
+from unittest import TestCase
+from model.board import create_board_from_string
+from model.lockstep import np, solve_lockstep
+from model.solver import solve_board
+
+_RULES_PUZZLE = '004000000500003600632418000907024003041607290200930401000361527003700008000000100'
+_GUESS_PUZZLE = '800000000,003600000,070090200,050007000,000045700,000100030,001000068,008500010,090000400'
+_INVALID_PUZZLE = '123456780,000000009' + ',000000000' * 7
+_REPEATED_PUZZLE = '110000000' + ',000000000' * 8
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class SolveLockstepTest(TestCase):
+
+    def test_matches_solve_board(self):
+        puzzles = [_RULES_PUZZLE, _GUESS_PUZZLE, _INVALID_PUZZLE, _REPEATED_PUZZLE, _RULES_PUZZLE.lower()]
+
+        solutions = solve_lockstep(puzzles)
+
+        expected = []
+        for puzzle in puzzles:
+            board = solve_board(create_board_from_string(puzzle)[0])
+            expected.append(str(board) if board.is_solved() else None)
+
+        self.assertEqual(expected, solutions)
+        self.assertIsNone(solutions[2])
+        self.assertIsNone(solutions[3])
+
+    def test_mixed_sizes(self):
+        puzzles = ['0' * 16, _RULES_PUZZLE, 'A8400013000002C0000080000DG000010G0000000504080000E00000900007400007E0090000D48210'
+                   '0000000G700000000000D0000005E00000000BA0F000090700000020800000000000500A40060F00000000000000000000'
+                   '0A00000FC000EF000000070090G0702000C0F000006B00007080000G00000000000000000070']
+
+        for puzzle, solution in zip(puzzles, solve_lockstep(puzzles)):
+            board, init_actions = create_board_from_string(solution)
+            self.assertTrue(board.is_solved())
+
+            for given, val in zip(puzzle, solution.replace(',', '')):
+                if given != '0':
+                    self.assertEqual(given, val)
+
+    def test_output_format(self):
+        solution, = solve_lockstep([_RULES_PUZZLE])
+
+        self.assertEqual(9 * 10, len(solution))
+        self.assertTrue(solution.endswith(','))
+        self.assertEqual(solution, str(create_board_from_string(solution)[0]))
+
+    def test_malformed(self):
+        for puzzle in ['not a puzzle', '0' * 80 + 'X', '0' * 80 + '!']:
+            with self.assertRaises(ValueError):
+                solve_lockstep([_RULES_PUZZLE, puzzle])
+
+    def test_empty(self):
+        self.assertEqual([], solve_lockstep([]))
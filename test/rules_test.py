@@ -0,0 +1,251 @@
+from unittest import TestCase
+from model.action import SetAction
+from model.board import create_board_from_string
+from model.rules import *
+
+_PUZZLE = '000001340,485000000,001089000,000500709,200000001,709004000,000920800,000000567,036700000'
+
+
+def _action_strs(actions):
+    return [repr(act) for act in actions]
+
+
+class DirtyTrackerTest(TestCase):
+
+    def test_tracking(self):
+        tracker = DirtyTracker()
+
+        self.assertIsNone(tracker.dirty_cells(rule_one_possible))
+
+        tracker.mark_clean(rule_one_possible)
+        self.assertEqual(set(), tracker.dirty_cells(rule_one_possible))
+
+        tracker.mark([(1, 2), (3, 4)])
+        self.assertEqual({(1, 2), (3, 4)}, tracker.dirty_cells(rule_one_possible))
+        self.assertIsNone(tracker.dirty_cells(rule_row_exclusive))
+
+        copy = tracker.copy()
+        copy.mark([(5, 5)])
+        self.assertEqual({(1, 2), (3, 4)}, tracker.dirty_cells(rule_one_possible))
+        self.assertEqual({(1, 2), (3, 4), (5, 5)}, copy.dirty_cells(rule_one_possible))
+
+        # Marking None means the whole board changed.
+        tracker.mark(None)
+        self.assertIsNone(tracker.dirty_cells(rule_one_possible))
+
+
+class IncrementalRuleTest(TestCase):
+
+    def test_all_dirty_matches_full(self):
+        board, init_actions = create_board_from_string(_PUZZLE)
+        board = board.apply_actions([SetAction(0, 0, 6)])
+
+        all_cells = set((x, y) for x in range(9) for y in range(9))
+
+        for rule in rule_set:
+            self.assertEqual(_action_strs(rule(board)), _action_strs(rule(board, all_cells)))
+
+    def test_clean_units_skipped(self):
+        board, init_actions = create_board_from_string(_PUZZLE)
+        board = board.apply_actions([SetAction(0, 0, 6)])
+
+        self.assertEqual([], rule_one_possible(board, set()))
+        self.assertEqual([], rule_row_exclusive(board, set()))
+        self.assertEqual([], rule_col_exclusive(board, set()))
+        self.assertEqual([], rule_quadrant_exclusive(board, set()))
+
+        # Only the units containing a dirty cell are examined.
+        for x in range(9):
+            row_actions = [act for act in rule_row_exclusive(board) if act.x() == x]
+            self.assertEqual(_action_strs(row_actions), _action_strs(rule_row_exclusive(board, {(x, 0)})))
+
+    def test_changed_cells(self):
+        board, init_actions = create_board_from_string(_PUZZLE)
+        self.assertIsNotNone(board.changed_cells())
+
+        new_board = board.apply_actions([SetAction(0, 0, 6)])
+        changed = set(new_board.changed_cells())
+
+        self.assertIn((0, 0), changed)
+        for x, y in changed:
+            self.assertTrue(x == 0 or y == 0 or (x < 3 and y < 3))
+
+
+class ExclusiveSetTest(TestCase):
+
+    def test_hidden_single(self):
+        board, init_actions = create_board_from_string('0' * 81)
+
+        # Remove 5 from every cell in row 0 except (0, 3), and 7 from every cell except (0, 3) and (0, 4).
+        actions = [ClearPossibleAction(0, y, 5) for y in range(9) if y != 3]
+        actions += [ClearPossibleAction(0, y, 7) for y in range(9) if y not in (3, 4)]
+        board = board.apply_actions(actions)
+
+        self.assertEqual(["SetAction (0,3): 5"], _action_strs(rule_row_exclusive(board)))
+
+        # Two exclusive values in one cell is invalid, so nothing is set there.
+        board = board.apply_actions([ClearPossibleAction(0, 4, 7)])
+        self.assertEqual([], _action_strs(rule_row_exclusive(board)))
+
+    def test_filled_units(self):
+        board, init_actions = create_board_from_string(
+            '874596312,519273684,632418759,957124863,341687295,286935471,498361527,163752948,725849136')
+
+        self.assertEqual([], rule_row_exclusive(board))
+        self.assertEqual([], rule_col_exclusive(board))
+        self.assertEqual([], rule_quadrant_exclusive(board))
+
+
+class CombinationRuleTest(TestCase):
+
+    def __row_board(self, row_vals):
+        # Builds an empty board where the cells of row 0 only have the given possible values.
+        board, init_actions = create_board_from_string('0' * 81)
+
+        actions = []
+        for y, vals in enumerate(row_vals):
+            actions.extend(ClearPossibleAction(0, y, val) for val in range(1, 10) if val not in vals)
+
+        return board.apply_actions(actions)
+
+    def __row_actions(self, board):
+        return sorted(repr(act) for act in combination_exclusive_rowcol_rule(board) if act.x() == 0)
+
+    def test_naked_pair(self):
+        all_vals = set(range(1, 10))
+        board = self.__row_board([{1, 2}, {1, 2}] + [all_vals] * 7)
+
+        expected = sorted("ClearPossibleAction (0,%d): %d" % (y, val) for y in range(2, 9) for val in (1, 2))
+        self.assertEqual(expected, self.__row_actions(board))
+
+    def test_naked_triple(self):
+        all_vals = set(range(1, 10))
+        board = self.__row_board([{1, 2}, {2, 3}, {1, 3}] + [all_vals] * 6)
+
+        expected = sorted("ClearPossibleAction (0,%d): %d" % (y, val) for y in range(3, 9) for val in (1, 2, 3))
+        self.assertEqual(expected, self.__row_actions(board))
+
+    def test_hidden_pair(self):
+        others = set(range(1, 8))
+        board = self.__row_board([set(range(1, 10)), set(range(1, 10))] + [others] * 7)
+
+        expected = sorted("ClearPossibleAction (0,%d): %d" % (y, val) for y in range(2) for val in range(1, 8))
+        self.assertEqual(expected, self.__row_actions(board))
+
+    def test_no_duplicates(self):
+        board, init_actions = create_board_from_string(
+            '000001340,485000000,001089000,000500709,200000001,709004000,000920800,000000567,036700000')
+
+        for rule in [combination_exclusive_rowcol_rule, combination_exclusive_quadrant_rule]:
+            board_actions = [repr(act) for act in rule(board)]
+            self.assertEqual(len(set(board_actions)), len(board_actions))
+
+            for act in rule(board):
+                self.assertTrue(board.get_cell(act.x(), act.y()).has_possible_val(act.value()))
+
+    def test_subset_max_size(self):
+        import model.rules
+
+        all_vals = set(range(1, 10))
+        board = self.__row_board([{1, 2}, {2, 3}, {1, 3}] + [all_vals] * 6)
+
+        old_size = model.rules.subset_max_size
+        model.rules.subset_max_size = 2
+        try:
+            self.assertEqual([], self.__row_actions(board))
+        finally:
+            model.rules.subset_max_size = old_size
+
+
+class QuadrantLineRuleTest(TestCase):
+
+    def __cleared_board(self, cells, val):
+        # Builds an empty board where val is not possible in any of the given cells.
+        board, init_actions = create_board_from_string('0' * 81)
+
+        return board.apply_actions([ClearPossibleAction(x, y, val) for x, y in cells])
+
+    def test_pointing(self):
+        # 5 can only go in row 0 of the top left quadrant, so it leaves the rest of row 0.
+        board = self.__cleared_board([(x, y) for x in (1, 2) for y in range(3)], 5)
+
+        expected = sorted("ClearPossibleAction (0,%d): 5" % y for y in range(3, 9))
+        self.assertEqual(expected, sorted(_action_strs(rule_quadrant_col_and_row_elim_possible(board))))
+
+    def test_pointing_col(self):
+        # 5 can only go in column 4 of the top middle quadrant, so it leaves the rest of column 4.
+        board = self.__cleared_board([(x, y) for x in range(3) for y in (3, 5)], 5)
+
+        expected = sorted("ClearPossibleAction (%d,4): 5" % x for x in range(3, 9))
+        self.assertEqual(expected, sorted(_action_strs(rule_quadrant_col_and_row_elim_possible(board))))
+
+    def test_claiming(self):
+        # 7 can only go in the first quadrant of row 4, so it leaves the rest of the middle left quadrant.
+        board = self.__cleared_board([(4, y) for y in range(3, 9)], 7)
+
+        expected = sorted("ClearPossibleAction (%d,%d): 7" % (x, y) for x in (3, 5) for y in range(3))
+        self.assertEqual(expected, sorted(_action_strs(rule_quadrant_col_and_row_elim_possible(board))))
+
+    def test_only_possible_values(self):
+        board, init_actions = create_board_from_string(_PUZZLE)
+        board_actions = rule_quadrant_col_and_row_elim_possible(board)
+
+        self.assertEqual(len(set(_action_strs(board_actions))), len(board_actions))
+        for act in board_actions:
+            self.assertTrue(board.get_cell(act.x(), act.y()).has_possible_val(act.value()))
+
+    def test_nothing_confined(self):
+        board, init_actions = create_board_from_string('0' * 81)
+
+        self.assertEqual([], rule_quadrant_col_and_row_elim_possible(board))
+
+
+class FishRuleTest(TestCase):
+
+    def __fish_board(self, row_cols, val):
+        # Builds an empty board where val is only possible in the given columns of the given rows.
+        board, init_actions = create_board_from_string('0' * 81)
+
+        return board.apply_actions([ClearPossibleAction(x, y, val)
+                                    for x, cols in row_cols.items() for y in range(9) if y not in cols])
+
+    def test_x_wing(self):
+        board = self.__fish_board({1: (2, 7), 5: (2, 7)}, 4)
+
+        expected = sorted("ClearPossibleAction (%d,%d): 4" % (x, y) for x in range(9) for y in (2, 7)
+                          if x not in (1, 5))
+        self.assertEqual(expected, sorted(_action_strs(rule_fish(board))))
+
+    def test_swordfish(self):
+        board = self.__fish_board({0: (1, 4), 3: (4, 7), 6: (1, 7)}, 4)
+
+        expected = sorted("ClearPossibleAction (%d,%d): 4" % (x, y) for x in range(9) for y in (1, 4, 7)
+                          if x not in (0, 3, 6))
+        self.assertEqual(expected, sorted(_action_strs(rule_fish(board))))
+
+    def test_columns(self):
+        board, init_actions = create_board_from_string('0' * 81)
+        board = board.apply_actions([ClearPossibleAction(x, y, 9) for y in (0, 8) for x in range(9) if x not in (3, 4)])
+
+        expected = sorted("ClearPossibleAction (%d,%d): 9" % (x, y) for x in (3, 4) for y in range(1, 8))
+        self.assertEqual(expected, sorted(_action_strs(rule_fish(board))))
+
+    def test_fish_max_size(self):
+        import model.rules
+
+        board = self.__fish_board({0: (1, 4), 3: (4, 7), 6: (1, 7)}, 4)
+
+        old_size = model.rules.fish_max_size
+        model.rules.fish_max_size = 2
+        try:
+            self.assertEqual([], rule_fish(board))
+        finally:
+            model.rules.fish_max_size = old_size
+
+    def test_only_possible_values(self):
+        board, init_actions = create_board_from_string(_PUZZLE)
+        board_actions = rule_fish(board)
+
+        self.assertEqual(len(set(_action_strs(board_actions))), len(board_actions))
+        for act in board_actions:
+            self.assertTrue(board.get_cell(act.x(), act.y()).has_possible_val(act.value()))
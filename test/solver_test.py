@@ -0,0 +1,113 @@
+from unittest import TestCase
+from model.board import create_board_from_string
+from model.solver import Solver, ENGINE_RECURSIVE, ENGINE_TRAIL, ENGINE_DLX, _solve_helper, _solve_in_place, \
+    solve_exact_cover, count_exact_cover_solutions, count_solutions
+
+
+# A puzzle that is solved by the rules alone, and one that needs the solver to guess.
+_RULES_PUZZLE = '004000000500003600632418000907024003041607290200930401000361527003700008000000100'
+_GUESS_PUZZLE = '800000000,003600000,070090200,050007000,000045700,000100030,001000068,008500010,090000400'
+_INVALID_PUZZLE = '123456780,000000009' + ',000000000' * 7
+
+
+def _trace_str(steps):
+    return [(rule, [repr(act) for act in actions]) for rule, actions in steps]
+
+
+class SolverTest(TestCase):
+
+    def test_engines_match(self):
+        for puzzle in [_RULES_PUZZLE, _GUESS_PUZZLE]:
+            board, init_actions = create_board_from_string(puzzle)
+
+            recursive_steps = _solve_helper(board, False)
+            trail_steps, trail_board = _solve_in_place(board)
+
+            self.assertEqual(_trace_str(recursive_steps), _trace_str(trail_steps))
+            self.assertTrue(trail_board.is_solved())
+
+            check_board = board.apply_actions([act for rule, actions in recursive_steps for act in actions])
+            self.assertEqual(str(check_board), str(trail_board))
+
+    def test_trail_guesses(self):
+        board, init_actions = create_board_from_string(_GUESS_PUZZLE)
+
+        steps, solved_board = _solve_in_place(board)
+
+        self.assertIn("solver_try_value", [rule for rule, actions in steps])
+
+        # The search must not modify the board it was given.
+        self.assertFalse(board.is_solved())
+
+    def test_trail_unsolvable(self):
+        board, init_actions = create_board_from_string(_INVALID_PUZZLE)
+
+        steps, result_board = _solve_in_place(board)
+
+        self.assertFalse(result_board.is_solved())
+
+    def test_solver_engine(self):
+        for engine in [ENGINE_RECURSIVE, ENGINE_TRAIL]:
+            board, init_actions = create_board_from_string(_GUESS_PUZZLE)
+            s = Solver(board, init_actions, False)
+
+            self.assertTrue(s.solve(engine))
+            self.assertTrue(s.get_board().is_solved())
+            self.assertEqual("initial", s.get_rule(0))
+
+        with self.assertRaises(ValueError):
+            Solver(board, init_actions).solve("unknown")
+
+    def test_exact_cover(self):
+        for puzzle in [_RULES_PUZZLE, _GUESS_PUZZLE]:
+            board, init_actions = create_board_from_string(puzzle)
+
+            solution = solve_exact_cover(board)
+            solved_board = board.apply_actions(solution)
+
+            self.assertTrue(solved_board.is_solved())
+            self.assertEqual(str(_solve_in_place(board)[1]), str(solved_board))
+            self.assertEqual(1, count_exact_cover_solutions(board))
+
+        board, init_actions = create_board_from_string(_INVALID_PUZZLE)
+        self.assertIsNone(solve_exact_cover(board))
+        self.assertEqual(0, count_exact_cover_solutions(board))
+
+        board, init_actions = create_board_from_string('0' * 16)
+        self.assertEqual(2, count_exact_cover_solutions(board))
+        self.assertEqual(10, count_exact_cover_solutions(board, 10))
+
+    def test_solver_exact_cover(self):
+        board, init_actions = create_board_from_string(_GUESS_PUZZLE)
+        s = Solver(board, init_actions, False)
+
+        self.assertTrue(s.solve(ENGINE_DLX))
+        self.assertEqual("exact_cover", s.get_rule())
+
+    def test_count_solutions(self):
+        for engine in [ENGINE_TRAIL, ENGINE_DLX]:
+            board, init_actions = create_board_from_string(_GUESS_PUZZLE)
+
+            self.assertEqual((1, None), count_solutions(board, engine=engine))
+
+            count, solution = count_solutions(board, keep_first=True, engine=engine)
+            self.assertEqual(1, count)
+            self.assertEqual(str(_solve_in_place(board)[1]), str(solution))
+
+            board, init_actions = create_board_from_string(_INVALID_PUZZLE)
+            self.assertEqual((0, None), count_solutions(board, keep_first=True, engine=engine))
+
+            # An empty 4x4 board has 288 solutions.
+            board, init_actions = create_board_from_string('0' * 16)
+            self.assertEqual(2, count_solutions(board, engine=engine)[0])
+            self.assertEqual(1, count_solutions(board, 1, engine=engine)[0])
+            self.assertEqual(288, count_solutions(board, 1000, engine=engine)[0])
+
+            count, solution = count_solutions(board, keep_first=True, engine=engine)
+            self.assertTrue(solution.is_solved())
+            self.assertFalse(board.is_solved())
+
+        with self.assertRaises(ValueError):
+            count_solutions(board, 0)
+        with self.assertRaises(ValueError):
+            count_solutions(board, engine="unknown")
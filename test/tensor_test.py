@@ -0,0 +1,104 @@
+import random
+import unittest
+from unittest import TestCase
+from model.action import ClearPossibleAction, SetAction
+from model.board import Board, create_board_from_string
+from model.solver import Solver, ENGINE_TENSOR, _solve_in_place, _solve_tensor, count_solutions, solve_board
+from model.tensor import np, tensor_from_board, tensor_rules
+
+_GUESS_PUZZLE = '800000000,003600000,070090200,050007000,000045700,000100030,001000068,008500010,090000400'
+_INVALID_PUZZLE = '123456780,000000009' + ',000000000' * 7
+
+
+def _trace_str(steps):
+    return [(rule, [repr(act) for act in actions]) for rule, actions in steps]
+
+
+def _random_actions(max_val, rng):
+    actions = [ClearPossibleAction(rng.randrange(max_val), rng.randrange(max_val), rng.randrange(1, max_val + 1))
+               for _ in range(max_val * max_val * (max_val - 2) // 2)]
+    actions.extend(SetAction(rng.randrange(max_val), rng.randrange(max_val), rng.randrange(1, max_val + 1))
+                   for _ in range(max_val))
+    rng.shuffle(actions)
+
+    return actions
+
+
+def _board_state(board):
+    return [(cell.value(), cell.possible_mask(), cell.is_initial()) for cell in board.all_cells()]
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class TensorBoardTest(TestCase):
+
+    def test_round_trip(self):
+        board, init_actions = create_board_from_string(_GUESS_PUZZLE)
+        board = board.apply_actions([ClearPossibleAction(0, 1, 1), SetAction(0, 2, 4)])
+
+        tensor_board = tensor_from_board(board)
+
+        self.assertEqual(_board_state(board), _board_state(tensor_board.to_board()))
+        self.assertEqual((9, 9, 9), tensor_board.candidates().shape)
+
+    def test_apply_actions(self):
+        rng = random.Random(1)
+
+        for max_val in [4, 9, 16]:
+            actions = _random_actions(max_val, rng)
+
+            tensor_board = tensor_from_board(Board(max_val))
+            tensor_board.apply_actions(actions)
+
+            self.assertEqual(_board_state(Board(max_val).apply_actions(actions)), _board_state(tensor_board.to_board()))
+
+    def test_rules_match(self):
+        rng = random.Random(2)
+
+        for max_val in [4, 9, 16]:
+            for _ in range(10):
+                board = Board(max_val).apply_actions(_random_actions(max_val, rng))
+                tensor_board = tensor_from_board(board)
+
+                for rule, tensor_rule in tensor_rules.items():
+                    self.assertEqual([repr(act) for act in rule(board)],
+                                     [repr(act) for act in tensor_rule(tensor_board)])
+
+    def test_invalid(self):
+        for puzzle in [_GUESS_PUZZLE, _INVALID_PUZZLE]:
+            board, init_actions = create_board_from_string(puzzle)
+
+            self.assertEqual(board.is_invalid(), tensor_from_board(board).is_invalid())
+
+        self.assertTrue(tensor_from_board(board).is_invalid())
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class TensorEngineTest(TestCase):
+
+    def test_matches_trail(self):
+        board, init_actions = create_board_from_string(_GUESS_PUZZLE)
+
+        trail_steps, trail_board = _solve_in_place(board)
+        tensor_steps, tensor_board = _solve_tensor(board)
+
+        self.assertEqual(_trace_str(trail_steps), _trace_str(tensor_steps))
+        self.assertEqual(str(trail_board), str(tensor_board))
+        self.assertTrue(tensor_board.is_solved())
+
+    def test_unsolvable(self):
+        board, init_actions = create_board_from_string(_INVALID_PUZZLE)
+
+        self.assertFalse(solve_board(board, ENGINE_TENSOR).is_solved())
+
+    def test_solver_and_count(self):
+        board, init_actions = create_board_from_string(_GUESS_PUZZLE)
+
+        s = Solver(board, init_actions, False)
+        self.assertTrue(s.solve(ENGINE_TENSOR))
+
+        count, solution = count_solutions(board, keep_first=True, engine=ENGINE_TENSOR)
+        self.assertEqual(1, count)
+        self.assertEqual(str(s.get_board()), str(solution))
+
+        empty_board, init_actions = create_board_from_string('0' * 16)
+        self.assertEqual(2, count_solutions(empty_board, engine=ENGINE_TENSOR)[0])
@@ -0,0 +1,44 @@
+from unittest import TestCase
+from model.units import UnitTables, unit_tables
+
+
+class UnitTablesTest(TestCase):
+
+    def test_cached(self):
+        self.assertIs(unit_tables(9), unit_tables(9))
+        self.assertIsNot(unit_tables(9), unit_tables(16))
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            UnitTables(1)
+        with self.assertRaises(ValueError):
+            UnitTables(8)
+
+    def test_units(self):
+        tables = unit_tables(9)
+
+        self.assertEqual(27, len(tables.units()))
+        self.assertEqual(tuple((2, y) for y in range(9)), tables.rows()[2])
+        self.assertEqual(tuple((x, 5) for x in range(9)), tables.cols()[5])
+        self.assertEqual(((3, 6), (3, 7), (3, 8), (4, 6), (4, 7), (4, 8), (5, 6), (5, 7), (5, 8)),
+                         tables.quadrant(4, 7))
+
+        self.assertEqual((4, 9 + 7, 18 + 5), tables.cell_units(4, 7))
+
+        for unit in tables.units():
+            self.assertEqual(9, len(unit))
+
+    def test_peers(self):
+        expected_counts = {4: 7, 9: 20, 16: 39, 25: 64}
+
+        for max_val, count in expected_counts.items():
+            tables = unit_tables(max_val)
+
+            for x, y in tables.coords():
+                peers = tables.peers(x, y)
+
+                self.assertEqual(count, len(peers))
+                self.assertEqual(count, len(set(peers)))
+                self.assertNotIn((x, y), peers)
+
+                self.assertEqual(set(peers) | {(x, y)}, set(tables.linked(x, y)))